@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+from moneyflexerski import ColumnStore, migrate_from_tinydb, open_database, open_ledger
+from moneyflexerski.ledger import HISTORY_ORDERS
+
+from .synthetic import SECTIONS, write_ledger
+
+try:
+    from moneyflexerski.app import ExpenseTrackerApp  # import-safe, only used to time row rendering
+except ImportError:  # Flet not installed, history is timed without building controls
+    ExpenseTrackerApp = None
+
+YEARS = 10
+START_YEAR = 2015
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def stats(samples):
+    return {
+        'runs': len(samples),
+        'mean_ms': round(statistics.fmean(samples) * 1000, 3),
+        'p50_ms': round(percentile(samples, 0.5) * 1000, 3),
+        'p95_ms': round(percentile(samples, 0.95) * 1000, 3),
+    }
+
+
+def timed(fn, repeat):
+    samples = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - started)
+    return stats(samples)
+
+
+def bench_startup(backend, path, repeat):
+    # What the app's loader thread does: open, index, sections, first month
+    def run(_):
+        ledger = open_ledger(backend, path)
+        ledger.load_sections()
+        ledger.month_summary(START_YEAR + YEARS - 1, 12)
+        ledger.close()
+    return timed(run, repeat)
+
+
+def bench_month_summary(ledger, repeat):
+    # update_chart on a month that isn't memoized yet
+    months = [(START_YEAR + i % YEARS, 1 + i % 12) for i in range(repeat)]
+
+    def run(i):
+        ledger.summaries.pop(months[i], None)
+        ledger.month_summary(*months[i])
+    return timed(run, repeat)
+
+
+def bench_history(ledger, order, repeat):
+    # create_history_table: first window in the chosen order, rendered to rows
+    def run(_):
+        records = ledger.history(order, 0, 100)
+        if ExpenseTrackerApp is not None:
+            [ExpenseTrackerApp.create_history_row(None, record) for record in records]
+    return timed(run, repeat)
+
+
+def bench_insert(ledger, repeat):
+    # save_expense_or_earning: one expense going to storage
+    def run(i):
+        ledger.insert({'type': 'expense', 'amount': 12.5, 'day': 1 + i % 28, 'year': START_YEAR, 'month': 1})
+    return timed(run, repeat)
+
+
+def bench_section_history(ledger, repeat):
+    # show_section_history: the section's records, newest first
+    def run(i):
+        records = ledger.section_records(SECTIONS[i % len(SECTIONS)])
+        records.sort(key=lambda r: (r['year'], r['month'], r['day']), reverse=True)
+    return timed(run, repeat)
+
+
+def bench_columnar_build(ledger, repeat):
+    # ColumnStore.from_ledger, with the memory the finished store holds
+    stores = []
+
+    def run(_):
+        stores[:] = [ColumnStore.from_ledger(ledger)]
+    result = timed(run, repeat)
+    result['store_bytes'] = stores[0].nbytes()
+    return result
+
+
+def bench_columnar_monthly_totals(store, repeat):
+    # Every month's totals by type, the yearly views' query
+    span = ((START_YEAR, 1), (START_YEAR + YEARS - 1, 12))
+    return timed(lambda _: store.monthly_totals(*span), repeat)
+
+
+def run_size(size, backends, workdir, repeat):
+    results = []
+    source = os.path.join(workdir, f'ledger_{size}.json')
+    started = time.perf_counter()
+    write_ledger(source, size, YEARS, START_YEAR)
+    print(f"generated {size} records in {time.perf_counter() - started:.1f}s")
+
+    for backend in backends:
+        path = os.path.join(workdir, f'{backend}_{size}' + ('.sqlite3' if backend == 'sqlite' else '.json'))
+        if backend == 'sqlite':
+            ledger = open_ledger('sqlite', path)
+            migrate_from_tinydb(open_database(source, 'json'), ledger)
+            ledger.close()
+        else:
+            shutil.copy(source, path)
+
+        def record(name, result):
+            result.update({'records': size, 'backend': backend, 'benchmark': name})
+            results.append(result)
+            print(f"  {backend:8} {name:28} p50 {result['p50_ms']:10.3f} ms  p95 {result['p95_ms']:10.3f} ms")
+
+        record('startup', bench_startup(backend, path, 3))
+        ledger = open_ledger(backend, path)
+        record('month_summary', bench_month_summary(ledger, repeat))
+        for order in HISTORY_ORDERS:
+            record(f'history_{order}', bench_history(ledger, order, repeat))
+        record('section_history', bench_section_history(ledger, repeat))
+        record('columnar_build', bench_columnar_build(ledger, 3))
+        record('columnar_monthly_totals', bench_columnar_monthly_totals(ColumnStore.from_ledger(ledger), repeat))
+        record('insert', bench_insert(ledger, min(repeat, 50)))
+        ledger.close()
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the ledger hot paths on synthetic data")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000], help="records per ledger (e.g. 10000 100000 1000000)")
+    parser.add_argument('--backends', nargs='+', default=['journal', 'sqlite'], choices=['json', 'journal', 'sqlite'])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--out', default='bench_results.json')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='moneyflexerski-bench-')
+    try:
+        results = []
+        for size in args.sizes:
+            results.extend(run_size(size, args.backends, workdir, args.repeat))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.out}")
+
+
+if __name__ == '__main__':
+    main()
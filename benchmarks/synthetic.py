@@ -0,0 +1,57 @@
+import argparse
+import json
+import random
+
+SECTIONS = ['food', 'rent', 'car', 'fun', 'savings', 'health', 'gifts', 'travel']
+
+
+def generate_records(count, years=10, start_year=2015, seed=0):
+    # Transactions shaped like the ones the app writes, spread over `years`
+    rng = random.Random(seed)
+    for _ in range(count):
+        record_type = rng.choices(['expense', 'additional_earning', 'section_entry'], weights=[80, 15, 5])[0]
+        record = {
+            'type': record_type,
+            'amount': round(rng.uniform(1, 250), 2),
+            'day': rng.randint(1, 28),
+            'year': start_year + rng.randrange(years),
+            'month': rng.randint(1, 12),
+        }
+        if record_type == 'section_entry':
+            record['section'] = rng.choice(SECTIONS)
+            record['amount'] = record['amount'] if rng.random() < 0.7 else -record['amount']
+        elif rng.random() < 0.3:
+            record['section'] = rng.choice(SECTIONS)
+        yield record
+
+
+def write_ledger(path, count, years=10, start_year=2015, seed=0):
+    # Streams a TinyDB JSON file (the same layout JSONStorage writes) without
+    # holding the records in memory, so 1M-row ledgers are cheap to make
+    doc_id = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"_default": {')
+        for year in range(start_year, start_year + years):
+            for month in range(1, 13):
+                doc_id += 1
+                income = {'type': 'income', 'amount': 3000.0, 'year': year, 'month': month}
+                f.write(('' if doc_id == 1 else ', ') + f'"{doc_id}": {json.dumps(income)}')
+        for record in generate_records(count, years, start_year, seed):
+            doc_id += 1
+            f.write(f', "{doc_id}": {json.dumps(record)}')
+        f.write('}, "sections": {')
+        f.write(', '.join(
+            f'"{i}": {json.dumps({"name": name, "balance": 0})}' for i, name in enumerate(SECTIONS, start=1)
+        ))
+        f.write('}}')
+    return doc_id
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Write a synthetic expense_db.json")
+    parser.add_argument('path')
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(write_ledger(args.path, args.records, args.years, seed=args.seed), "documents written")
@@ -0,0 +1,43 @@
+from .async_ledger import AsyncLedger, open_async_ledger
+from .columnar import ColumnStore
+from .exporter import export_columnar, export_csv, export_ledger, read_columnar
+from .importer import ImportReport, import_file, import_records, read_csv, read_ofx
+from .ledger import Ledger
+from .rollup import Rollup
+from .series import CumulativeSeries, cumulative_series, downsample, iter_months, lttb, minmax_buckets, prefix_sums
+from .sqlite_ledger import SqliteLedger, migrate_from_tinydb
+from .storage import JournalStorage, open_database, open_ledger
+from .summary import MonthSummary, get_days_in_month, summarize_columns, summarize_month
+
+__all__ = [
+    "AsyncLedger",
+    "ColumnStore",
+    "CumulativeSeries",
+    "ImportReport",
+    "JournalStorage",
+    "Ledger",
+    "MonthSummary",
+    "Rollup",
+    "SqliteLedger",
+    "cumulative_series",
+    "downsample",
+    "export_columnar",
+    "export_csv",
+    "export_ledger",
+    "get_days_in_month",
+    "import_file",
+    "import_records",
+    "iter_months",
+    "lttb",
+    "migrate_from_tinydb",
+    "minmax_buckets",
+    "open_async_ledger",
+    "open_database",
+    "open_ledger",
+    "prefix_sums",
+    "read_columnar",
+    "read_csv",
+    "read_ofx",
+    "summarize_columns",
+    "summarize_month",
+]
@@ -0,0 +1,1447 @@
+import flet as ft
+import asyncio
+import atexit
+from contextlib import asynccontextmanager, contextmanager
+import contextvars
+from datetime import datetime, date
+import functools
+import os
+import threading
+import time
+from .async_ledger import open_async_ledger
+from .instrumentation import count_controls, get_instrumentation
+from .series import cumulative_series, downsample, shift_month
+from .storage import last_modified
+from .summary import get_days_in_month
+# The database is only opened once the window is up. MONEYFLEXERSKI_STORAGE
+# picks journal (default), json (plain TinyDB file) or sqlite and
+# MONEYFLEXERSKI_DB overrides the file path.
+# New entries are written in groups this many seconds apart (0 writes each one immediately)
+DB_BATCH_SECONDS = float(os.environ.get('MONEYFLEXERSKI_BATCH_SECONDS', '2'))
+# Ledger calls timed when MONEYFLEXERSKI_PROFILE is set
+LEDGER_OPERATIONS = [
+    'insert', 'upsert', 'month_summary', 'history', 'section_records',
+    'section_totals', 'load_sections', 'add_section', 'add_section_entry',
+]
+
+# Helper functions
+def get_db_last_modified_time(path):
+    return datetime.fromtimestamp(last_modified(path)).strftime("%Y-%m-%d %H:%M:%S")
+
+# Bar chart rods per day and line chart series, in drawing order
+BAR_SERIES = [
+    ('Income', ft.colors.GREEN),
+    ('Expense', ft.colors.RED),
+    ('Balance', ft.colors.BLUE),
+    ('Additional Earning', ft.colors.ORANGE),
+]
+LINE_SERIES = [(ft.colors.GREEN, 2), (ft.colors.RED, 2), (ft.colors.ORANGE, 2), (ft.colors.BLUE, 3)]
+TOTALS_SERIES = [
+    ('Income', ft.colors.GREEN),
+    ('Expenses', ft.colors.RED),
+    ('Additional Earnings', ft.colors.ORANGE),
+    ('Net', ft.colors.BLUE),
+]
+# The range chart sends at most this many points per line, whatever the span
+MAX_LINE_POINTS = 240
+RANGE_MONTHS_MIN = 3
+RANGE_MONTHS_MAX = 240
+# Seconds a ledger call may take before the progress bar shows up
+BUSY_DELAY = 0.15
+
+def all_years_totals(ledger):
+    # {year: {type: total}} for every year with data, from the rollups
+    span = ledger.rollup_span()
+    return ledger.yearly_totals(span[0][0], span[1][0]) if span else {}
+
+def load_year_overview(ledger, year):
+    # Rollup reads behind the yearly tab: this year and the one before by
+    # month, plus the year's section totals
+    monthly = ledger.monthly_totals((year - 1, 1), (year, 12))
+    return {'year': year, 'monthly': monthly, 'sections': ledger.section_rollup((year, 1), (year, 12))}
+
+# How many batches the current handler is inside. A context variable rather
+# than a thread-local: async handlers all run on the event loop thread, but
+# each runs in its own task, and every task (and thread) has its own context.
+_batch_depth = contextvars.ContextVar('batch_depth', default=0)
+
+# Handlers mark the regions they changed and the scheduler redraws each dirty
+# region once, then sends a single page.update() when the outermost handler
+# returns, instead of every helper pushing its own update
+class RenderScheduler:
+    def __init__(self, page, renderers):
+        self.page = page
+        self.renderers = renderers  # region -> redraw function, run in this order
+        self.dirty = set()
+        self.lock = threading.Lock()
+
+    def mark(self, *regions):
+        # No regions means the controls were changed in place and only need sending
+        with self.lock:
+            self.dirty.update(regions or ('page',))
+        if not _batch_depth.get():
+            self.flush()
+
+    @contextmanager
+    def batch(self):
+        token = _batch_depth.set(_batch_depth.get() + 1)
+        try:
+            yield
+        finally:
+            _batch_depth.reset(token)
+            if not _batch_depth.get():
+                self.flush()
+
+    def flush(self):
+        updated = False
+        token = _batch_depth.set(1)  # Redraws may mark more regions, they join this flush
+        try:
+            while True:
+                with self.lock:
+                    dirty, self.dirty = self.dirty, set()
+                if not dirty:
+                    break
+                for region, render in self.renderers.items():
+                    if region in dirty:
+                        render()
+                updated = True
+        finally:
+            _batch_depth.reset(token)
+        if updated:
+            self.page.update()
+
+def event(handler):
+    # One render per user event, however many regions the handler marks.
+    # Async handlers keep the batch open across their awaits.
+    if asyncio.iscoroutinefunction(handler):
+        @functools.wraps(handler)
+        async def handle_async(self, *args, **kwargs):
+            with self.renderer.batch():
+                return await handler(self, *args, **kwargs)
+        return handle_async
+
+    @functools.wraps(handler)
+    def handle(self, *args, **kwargs):
+        with self.renderer.batch():
+            return handler(self, *args, **kwargs)
+    return handle
+
+# Main application class
+class ExpenseTrackerApp:
+    def __init__(self, page: ft.Page):
+        started = time.perf_counter()
+        self.startup_timings = {}  # seconds since __init__ started, per milestone
+        self.page = page
+        # Opt-in timings (MONEYFLEXERSKI_PROFILE), a no-op otherwise
+        self.instrumentation = get_instrumentation()
+        self.instrumentation.instrument(self, ['update_results', 'update_chart', 'update_history'])
+        self.page.update = self.instrumentation.wrap('page.update', self.page.update, lambda: count_controls(self.page))
+        self.renderer = RenderScheduler(self.page, {
+            'results': self.update_results,
+            'chart': self.update_chart,
+            'history': self.update_history,
+            'sections': self.update_sections_layout,
+            'year': self.update_year_overview,
+        })
+        self.setup_page()
+        self.current_week = 1
+        self.zoom_level = 1
+        self.min_zoom = 0.5
+        self.max_zoom = 2
+        self.chart_type = 'bar_chart'
+        self.range_months = 120  # Span of the range chart, zoom halves or doubles it
+        self.range_offset = 0  # Months the range chart is panned away from the selected month
+        self.chart = None
+        self.charts = {}  # One chart per type, reused for the whole session
+        self.chart_with_zoom = None
+        self.prefetch_task = None
+        self.summary = None  # The selected month's summary, loaded by prepare_view
+        self.chart_data = (None, None)  # (chart_source key, data) loaded by prepare_view
+        self.year_overview = None
+        self.history_sort_order = "newest_first"
+        # Handlers await the ledger through self.data (a worker thread) and
+        # keep what they loaded; redraws only read those values
+        self.data = None
+        self.ledger = None
+        self.sections = []
+        self.section_month_totals = {}
+        self.busy_count = 0
+        self.busy_indicator = ft.ProgressBar(visible=False)
+        self.page.overlay.append(self.busy_indicator)
+        # Paint the dashboard first, the ledger loads after the first frame is out
+        self.setup_ui_components()
+        if self.instrumentation.enabled:
+            self.navigation_buttons_dashboard.content.controls.append(
+                ft.ElevatedButton(text="🐞", on_click=self.show_debug_panel, height=50)
+            )
+        self.dashboard_content.disabled = True
+        self.page.update()
+        self.startup_timings['first_frame'] = time.perf_counter() - started
+        self.page.run_task(self.load_ledger, started)
+
+    async def load_ledger(self, started):
+        self.data = await open_async_ledger(batch_seconds=DB_BATCH_SECONDS)  # Opened once, reads go through it from now on
+        self.ledger = self.data.ledger
+        self.instrumentation.instrument(self.ledger, LEDGER_OPERATIONS, prefix='ledger.')
+        # Closing flushes the batch and saves the rollup sidecar, so the
+        # next start doesn't rebuild it from every record
+        self.page.on_close = self.close_ledger
+        atexit.register(self.ledger.close)
+        self.sections = await self.data.load_sections() or []  # Load sections from database
+        await self.prepare_view()
+        # Only the reveal is batched, handlers running during the load render as usual
+        with self.renderer.batch():
+            self.loading_indicator.visible = False
+            self.dashboard_content.disabled = False
+            self.renderer.mark('results', 'chart')
+        self.startup_timings['ledger_ready'] = time.perf_counter() - started
+
+    async def close_ledger(self, e):
+        # The session is over (at process exit atexit does the same)
+        atexit.unregister(self.ledger.close)
+        await self.data.close()
+
+    @asynccontextmanager
+    async def busy(self):
+        # Progress bar for ledger work slower than BUSY_DELAY, quick calls
+        # finish before it would show and cost no extra frame
+        self.busy_count += 1
+        show = asyncio.get_running_loop().call_later(BUSY_DELAY, self.show_busy)
+        try:
+            yield
+        finally:
+            show.cancel()
+            self.busy_count -= 1
+            if self.busy_count == 0 and self.busy_indicator.visible:
+                self.busy_indicator.visible = False
+                self.renderer.mark()
+
+    def show_busy(self):
+        if self.busy_count and not self.busy_indicator.visible:
+            self.busy_indicator.visible = True
+            self.page.update()
+
+    async def prepare_view(self):
+        # Runs the reads the next redraw needs on the worker thread; the
+        # redraw then only reads self.summary and self.chart_data
+        year, month = int(self.year_dropdown.value), int(self.month_dropdown.value)
+        async with self.busy():
+            self.summary = await self.data.month_summary(year, month)
+            if self.chart_with_zoom is not None:
+                key, load = self.chart_source()
+                self.chart_data = (key, await self.data.run(load))
+        self.schedule_prefetch(year, month)
+
+    def schedule_prefetch(self, year, month):
+        # Warms the months one step away (and the same month last year) after
+        # each navigation. A newer navigation cancels what is still queued.
+        if self.prefetch_task is not None:
+            self.prefetch_task.cancel()
+        months = [shift_month(year, month, -1), shift_month(year, month, 1), (year - 1, month)]
+        self.prefetch_task = asyncio.get_running_loop().create_task(self.prefetch(months))
+
+    async def prefetch(self, months):
+        # One month per worker call, so a request from the user waits behind
+        # at most one of these
+        for year, month in months:
+            await self.data.month_summaries([(year, month)])
+
+    def chart_source(self):
+        # (key, load) for what the current chart type reads; load takes the ledger.
+        # The year and range charts only read the rollups.
+        year, month = int(self.year_dropdown.value), int(self.month_dropdown.value)
+        if self.chart_type == "range_chart":
+            start, end = self.range_bounds()
+            return ('range', start, end), lambda ledger: ledger.rollup_series(start, end)
+        if self.chart_type == "year_chart":
+            return ('year', year), lambda ledger: ledger.monthly_totals((year, 1), (year, 12))
+        if self.chart_type == "years_chart":
+            return ('years',), all_years_totals
+        return ('month', year, month), lambda ledger: ledger.month_summary(year, month)
+
+    def current_chart_data(self):
+        # What prepare_view loaded for the current chart, None while the view
+        # has moved on and its load is still running
+        key, _ = self.chart_source()
+        return self.chart_data[1] if self.chart_data[0] == key else None
+
+    def setup_page(self):
+        self.page.title = "MoneyFlexerski"
+        self.page.theme_mode = ft.ThemeMode.DARK
+        self.page.window.width = 1000
+        self.page.window.height = 800
+
+        self.page.bgcolor = ft.colors.TRANSPARENT
+        self.page.decoration = ft.BoxDecoration(
+            image=ft.DecorationImage(
+                src=f"assets/pexels-sagui-andrea-200115-618833.jpg",
+                fit=ft.ImageFit.COVER,
+                opacity=0.2,
+            ),
+            gradient=ft.LinearGradient(
+                colors=[ft.colors.BROWN, ft.colors.BLACK],
+                stops=[0, 1],
+                begin=ft.alignment.top_left,
+                end=ft.alignment.bottom_right,
+            ),
+        )
+
+    def create_chart(self):
+        # Built the first time a type is shown, afterwards only its values change
+        if self.chart_type not in self.charts:
+            if self.chart_type == 'bar_chart':
+                self.charts['bar_chart'] = self.create_bar_chart()
+            elif self.chart_type == 'line_chart':
+                self.charts['line_chart'] = self.create_line_chart()
+            elif self.chart_type == 'range_chart':
+                self.charts['range_chart'] = self.create_line_chart()
+                self.charts['range_chart'].bottom_axis = ft.ChartAxis(title=ft.Text("Date"), labels=[], labels_size=30)
+            elif self.chart_type in ('year_chart', 'years_chart'):
+                self.charts[self.chart_type] = self.create_totals_chart()
+        self.chart = self.charts.get(self.chart_type)
+
+        if self.chart_with_zoom:
+            self.chart_with_zoom.controls = [self.chart] if self.chart else []
+            self.renderer.mark('chart')  # Fill it with data
+    def setup_ui_components(self):
+        current_year = datetime.now().year
+        current_month = datetime.now().month
+
+        # Navigation buttons in a horizontally scrollable row
+        self.navigation_buttons = ft.Container(
+            content=ft.Row(
+                controls=[
+                    ft.ElevatedButton(text=" 🎛️", on_click=self.show_dashboard, height=50),
+                    ft.ElevatedButton(text=" 📜", on_click=self.show_history, height=50),
+                    ft.ElevatedButton(text="📊", on_click=self.show_charts, height=50),
+                    ft.ElevatedButton(text="📂", on_click=self.show_sections, height=50),
+                    ft.ElevatedButton(text="📅", on_click=self.show_year, height=50),
+                    # Add more buttons if needed...
+                ],
+                alignment=ft.MainAxisAlignment.START,
+                spacing=10,
+                scroll=ft.ScrollMode.ALWAYS  # Enable horizontal scrolling
+            ),
+            padding=ft.padding.only(top=40, left=10, right=10, bottom=10),
+            alignment=ft.alignment.top_center
+        )
+        self.navigation_buttons_dashboard = ft.Container(
+            content=ft.Row(
+                controls=[
+                    ft.ElevatedButton(text=" [🎛️]", on_click=self.show_dashboard, height=50, bgcolor=ft.colors.AMBER_200),
+                    ft.ElevatedButton(text=" 📜", on_click=self.show_history, height=50),
+                    ft.ElevatedButton(text="📊", on_click=self.show_charts, height=50),
+                    ft.ElevatedButton(text="📂", on_click=self.show_sections, height=50),
+                    ft.ElevatedButton(text="📅", on_click=self.show_year, height=50),
+                    # Add more buttons if needed...
+                ],
+                alignment=ft.MainAxisAlignment.START,
+                spacing=10,
+                scroll=ft.ScrollMode.ALWAYS  # Enable horizontal scrolling
+            ),
+            padding=ft.padding.only(top=40, left=10, right=10, bottom=10),
+            alignment=ft.alignment.top_center
+        )
+
+        self.navigation_buttons_sections = ft.Container(
+            content=ft.Row(
+                controls=[
+                    ft.ElevatedButton(text=" 🎛️", on_click=self.show_dashboard, height=50),
+                    ft.ElevatedButton(text=" 📜", on_click=self.show_history, height=50),
+                    ft.ElevatedButton(text="📊", on_click=self.show_charts, height=50),
+                    ft.ElevatedButton(text="[📂]", on_click=self.show_sections, height=50, bgcolor=ft.colors.AMBER_200),
+                    ft.ElevatedButton(text="📅", on_click=self.show_year, height=50),
+                    # Add more buttons if needed...
+                ],
+                alignment=ft.MainAxisAlignment.START,
+                spacing=10,
+                scroll=ft.ScrollMode.ALWAYS  # Enable horizontal scrolling
+            ),
+            padding=ft.padding.only(top=40, left=10, right=10, bottom=10),
+            alignment=ft.alignment.top_center
+        )
+        self.navigation_buttons_history = ft.Container(
+            content=ft.Row(
+                controls=[
+                    ft.ElevatedButton(text=" 🎛️", on_click=self.show_dashboard, height=50),
+                    ft.ElevatedButton(text=" [📜]", on_click=self.show_history, height=50, bgcolor=ft.colors.AMBER_200),
+                    ft.ElevatedButton(text="📊", on_click=self.show_charts, height=50),
+                    ft.ElevatedButton(text="📂", on_click=self.show_sections, height=50),
+                    ft.ElevatedButton(text="📅", on_click=self.show_year, height=50),
+                    # Add more buttons if needed...
+                ],
+                alignment=ft.MainAxisAlignment.START,
+                spacing=10,
+                scroll=ft.ScrollMode.ALWAYS  # Enable horizontal scrolling
+            ),
+            padding=ft.padding.only(top=40, left=10, right=10, bottom=10),
+            alignment=ft.alignment.top_center
+        )
+        self.navigation_buttons_chart = ft.Container(
+            content=ft.Row(
+                controls=[
+                    ft.ElevatedButton(text=" 🎛️", on_click=self.show_dashboard, height=50),
+                    ft.ElevatedButton(text=" 📜", on_click=self.show_history, height=50),
+                    ft.ElevatedButton(text="[📊]", on_click=self.show_charts, height=50, bgcolor=ft.colors.AMBER_200),
+                    ft.ElevatedButton(text="📂", on_click=self.show_sections, height=50),
+                    ft.ElevatedButton(text="📅", on_click=self.show_year, height=50),
+                    # Add more buttons if needed...
+                ],
+                alignment=ft.MainAxisAlignment.START,
+                spacing=10,
+                scroll=ft.ScrollMode.ALWAYS  # Enable horizontal scrolling
+            ),
+            padding=ft.padding.only(top=40, left=10, right=10, bottom=10),
+            alignment=ft.alignment.top_center
+        )
+        self.navigation_buttons_year = ft.Container(
+            content=ft.Row(
+                controls=[
+                    ft.ElevatedButton(text=" 🎛️", on_click=self.show_dashboard, height=50),
+                    ft.ElevatedButton(text=" 📜", on_click=self.show_history, height=50),
+                    ft.ElevatedButton(text="📊", on_click=self.show_charts, height=50),
+                    ft.ElevatedButton(text="📂", on_click=self.show_sections, height=50),
+                    ft.ElevatedButton(text="[📅]", on_click=self.show_year, height=50, bgcolor=ft.colors.AMBER_200),
+                ],
+                alignment=ft.MainAxisAlignment.START,
+                spacing=10,
+                scroll=ft.ScrollMode.ALWAYS  # Enable horizontal scrolling
+            ),
+            padding=ft.padding.only(top=40, left=10, right=10, bottom=10),
+            alignment=ft.alignment.top_center
+        )
+
+        # Year dropdown
+        self.year_dropdown = ft.Dropdown(
+            label="Year",
+            options=[ft.dropdown.Option(str(year)) for year in range(current_year - 5, current_year + 6)],
+            value=str(current_year),
+            width=100,
+            on_change=self.change_period
+        )
+
+        # Month dropdown
+        self.month_dropdown = ft.Dropdown(
+            label="Month",
+            options=[ft.dropdown.Option(str(i)) for i in range(1, 13)],
+            value=str(current_month),
+            width=100,
+            on_change=self.change_period
+        )
+
+        # Income input and button
+        self.income_input = ft.TextField(label="Monthly Income", width=200)
+        self.income_button = ft.ElevatedButton(text="Save Income", on_click=self.save_income)
+        self.income_result = ft.Text(size=30)
+
+        # Expense input, day dropdown, and button
+        self.expense_input = ft.TextField(label="Expense Amount", width=200)
+        self.day_dropdown = ft.Dropdown(
+            label="Day",
+            options=[ft.dropdown.Option(str(i)) for i in range(1, 32)],
+            width=100
+        )
+        self.expense_button = ft.ElevatedButton(text="Save Expense", on_click=self.save_expense)
+
+        # Additional earning input and button
+        self.additional_earning_input = ft.TextField(label="Additional Earning", width=200)
+        self.additional_earning_day_dropdown = ft.Dropdown(
+            label="Day",
+            options=[ft.dropdown.Option(str(i)) for i in range(1, 32)],
+            width=100
+        )
+        self.additional_earning_button = ft.ElevatedButton(text="Save Additional Earning", on_click=self.save_additional_earning)
+
+        # Per-section totals for the selected month
+        self.section_results = ft.Column([], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=2)
+
+        self.fancy_button = ft.ElevatedButton(
+            text="Save Expense/Earning",
+            on_click=self.save_expense_or_earning,
+            style=ft.ButtonStyle(
+                color={
+                    ft.ControlState.HOVERED: ft.colors.WHITE,
+                    ft.ControlState.DEFAULT: ft.colors.BLACK,
+                },
+                bgcolor={
+                    ft.ControlState.HOVERED: ft.colors.GREEN,
+                    ft.ControlState.DEFAULT: ft.colors.PURPLE,
+                },
+                padding=20,
+
+            ),
+        )
+
+        self.expense_result = ft.Text(size=30, color=ft.colors.RED)
+        self.additional_earning_result = ft.Text(size=30, color=ft.colors.ORANGE)
+        self.balance_result = ft.Text(size=30, color=ft.colors.BLUE)
+
+        # Shown until the ledger has loaded in the background
+        self.loading_indicator = ft.ProgressBar()
+
+        # Page title
+        #self.page_title = ft.Text("Click here if you want to support the app", size=20, weight=ft.FontWeight.BOLD)
+        self.page_title = ft.GestureDetector(
+            content=ft.Text("->🙃Consider donating🙂<-", size=20, weight=ft.FontWeight.BOLD),
+            on_tap=self.show_support_alert  # Call the method to show alert on tap/click
+        )
+        # Main layout for dashboard
+        self.dashboard_content = ft.Column([
+
+            self.navigation_buttons_dashboard,
+            self.loading_indicator,
+            ft.Row([self.year_dropdown, self.month_dropdown], alignment=ft.MainAxisAlignment.CENTER),
+            ft.ListView(
+                [
+
+                    ft.Row([self.income_input, self.income_button], alignment=ft.MainAxisAlignment.CENTER),
+                    ft.Row([self.expense_input, self.day_dropdown], alignment=ft.MainAxisAlignment.CENTER),
+                    ft.Row([self.additional_earning_input, self.additional_earning_day_dropdown], alignment=ft.MainAxisAlignment.CENTER),
+                    ft.Row([self.fancy_button], alignment=ft.MainAxisAlignment.CENTER),
+                    ft.Row([self.income_result], alignment=ft.MainAxisAlignment.CENTER),
+                    ft.Row([self.additional_earning_result], alignment=ft.MainAxisAlignment.CENTER),
+                    ft.Row([self.expense_result], alignment=ft.MainAxisAlignment.CENTER),
+                    ft.Row([self.balance_result], alignment=ft.MainAxisAlignment.CENTER),
+                    ft.Row([self.section_results], alignment=ft.MainAxisAlignment.CENTER),
+                    ft.Row([self.page_title], alignment=ft.MainAxisAlignment.CENTER),
+                                                                        ft.Row([ft.Text("MoneyFlexerski(money tracking by furime)")], alignment=ft.MainAxisAlignment.CENTER ),
+
+                ],
+                spacing=5,
+                padding=10,
+                expand=True,
+            )
+        ], 
+        alignment=ft.MainAxisAlignment.START,
+        expand=True
+        )
+
+        # Adjust the size of input fields and buttons
+        for widget in [self.income_input, self.expense_input, self.additional_earning_input, 
+                    self.income_button, self.fancy_button, self.day_dropdown, 
+                    self.additional_earning_day_dropdown]:
+            if isinstance(widget, ft.TextField):
+                widget.width = 150  # Adjust width as needed
+                widget.height = 40  # Adjust height as needed
+            elif isinstance(widget, ft.Dropdown):
+                widget.width = 100  # Adjust width as needed
+            elif isinstance(widget, ft.ElevatedButton):
+                widget.width = 200  # Adjust width as needed
+                widget.height = 75  # Adjust height as needed
+
+        # Adjust the size of result text
+        for widget in [self.income_result, self.additional_earning_result, 
+                    self.expense_result, self.balance_result, self.page_title]:
+            widget.size = 20  # Adjust font size as needed
+
+        # The other tabs are built the first time they are opened
+        self.history_content = None
+        self.charts_content = None
+        self.sections_content = None
+        self.year_content = None
+
+        # Create a separate container for navigation buttons
+        self.navigation_container = ft.Container()
+
+        # Add initial dashboard content, sent with the first frame
+        self.page.controls.append(self.dashboard_content)
+
+    def build_history_tab(self):
+        # Update history content to include the sort dropdown
+        self.history_page_size = 100
+        self.history_lock = asyncio.Lock()  # one load_more_history at a time
+        self.history_list_view = ft.ListView(expand=1, spacing=10, padding=20, on_scroll=self.on_history_scroll, on_scroll_interval=100)
+        self.history_sort_dropdown = ft.Dropdown(
+            label="Sort History",
+            options=[
+                ft.dropdown.Option("Newest First"),
+                ft.dropdown.Option("Oldest First"),
+                ft.dropdown.Option("Highest Amount"),
+                ft.dropdown.Option("Lowest Amount"),
+            ],
+            value="Newest First",
+            width=200,
+            on_change=self.update_history_sort,
+        )
+        self.history_content = ft.Column([
+            self.navigation_buttons_history,
+            self.history_sort_dropdown,
+            self.history_list_view,
+        ], expand=True)
+
+    def build_charts_tab(self):
+        self.chart_with_zoom = ft.Column(
+            [],
+            alignment=ft.MainAxisAlignment.CENTER,
+        )
+        # Main layout for charts
+        self.charts_content = ft.Column([
+            self.navigation_buttons_chart,
+            self.create_chart_type_dropdown(),  # Dropdown for chart types
+            self.chart_with_zoom,  # Show the chart
+        ], alignment=ft.MainAxisAlignment.CENTER, spacing=10)
+
+    def build_sections_tab(self):
+        # Create Sections page content
+        self.sections_content = ft.Column([
+            self.navigation_buttons_sections,
+            ft.Text("Sections", size=30, weight=ft.FontWeight.BOLD),
+            self.create_sections_layout()
+        ], alignment=ft.MainAxisAlignment.START, expand=True, scroll=ft.ScrollMode.AUTO)
+
+    def build_year_tab(self):
+        # Yearly overview, filled from the rollups by update_year_overview
+        self.year_title = ft.Text(size=30, weight=ft.FontWeight.BOLD)
+        self.year_summary_text = ft.Text(size=16)
+        self.year_comparison_text = ft.Text(size=16)
+        self.year_rows = [
+            ft.DataRow(cells=[ft.DataCell(ft.Text(label)) for label in [str(month), "", "", "", ""]])
+            for month in list(range(1, 13)) + ["Total"]
+        ]
+        self.year_table = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Month")),
+                ft.DataColumn(ft.Text("Income"), numeric=True),
+                ft.DataColumn(ft.Text("Expenses"), numeric=True),
+                ft.DataColumn(ft.Text("Earnings"), numeric=True),
+                ft.DataColumn(ft.Text("Net"), numeric=True),
+            ],
+            rows=self.year_rows,
+        )
+        self.year_sections = ft.Column([])
+        self.year_content = ft.Column([
+            self.navigation_buttons_year,
+            self.year_title,
+            self.year_summary_text,
+            self.year_comparison_text,
+            self.year_table,
+            ft.Text("Sections this year", size=20, weight=ft.FontWeight.BOLD),
+            self.year_sections,
+        ], alignment=ft.MainAxisAlignment.START, expand=True, scroll=ft.ScrollMode.AUTO)
+
+    def update_year_overview(self):
+        overview = self.year_overview
+        year, monthly = overview['year'], overview['monthly']
+
+        def totals(months):
+            income = sum(monthly.get(month, {}).get('income', 0) for month in months)
+            expenses = sum(monthly.get(month, {}).get('expense', 0) for month in months)
+            earnings = sum(monthly.get(month, {}).get('additional_earning', 0) for month in months)
+            return income, expenses, earnings, income + earnings - expenses
+
+        for row, month in zip(self.year_rows, range(1, 13)):
+            for cell, amount in zip(row.cells[1:], totals([(year, month)])):
+                cell.content.value = f"${amount:.2f}"
+        this_year = totals([(year, month) for month in range(1, 13)])
+        last_year = totals([(year - 1, month) for month in range(1, 13)])
+        for cell, amount in zip(self.year_rows[-1].cells[1:], this_year):
+            cell.content.value = f"${amount:.2f}"
+
+        self.year_title.value = f"Year {year}"
+        self.year_summary_text.value = (
+            f"Income ${this_year[0]:.2f} · Expenses ${this_year[1]:.2f} · "
+            f"Additional Earnings ${this_year[2]:.2f} · Net ${this_year[3]:.2f}"
+        )
+        changes = [
+            f"{name} {'+' if now >= before else '-'}${abs(now - before):.2f}"
+            for name, now, before in zip(("Expenses", "Net"), this_year[1::2], last_year[1::2])
+        ]
+        self.year_comparison_text.value = f"Compared with {year - 1}: " + ", ".join(changes)
+        self.year_sections.controls = [
+            ft.Text(f"📂 {name}: ${total:.2f}", size=16)
+            for name, total in sorted(overview['sections'].items())
+        ]
+
+    @event
+    async def show_year(self, e):
+        # Follows the dashboard's year selection
+        if self.year_content is None:
+            self.build_year_tab()
+        async with self.busy():
+            self.year_overview = await self.data.run(load_year_overview, int(self.year_dropdown.value))
+        self.renderer.mark('year')
+        self.show_tab(self.year_content)
+
+    @event
+    async def update_history_sort(self, e):
+        self.history_sort_order = e.control.value.lower().replace(" ", "_")
+        await self.load_history_page()
+        self.renderer.mark('history')  # Rebuilds the table in the new order
+    @event
+    def show_support_alert(self, e):
+        # Support options array (for example, donation links or texts)
+        support_options = [
+            {"label": "[Polish] Bank ", "text": "PL80 1140 2004 0000 3602 7931 9635"},
+            {"label": "Paypal", "text": "https://www.paypal.com/paypalme/Furime"},
+           
+        ]
+
+        # Create a list of clickable support options
+        support_items = [
+            ft.GestureDetector(
+                content=ft.Text(option["label"], size=20, weight=ft.FontWeight.BOLD, color=ft.colors.BLUE),
+                on_tap=lambda e, option=option: self.copy_to_clipboard(option["text"])  # Copy to clipboard on click
+            )
+            for option in support_options
+        ]
+
+        # Create a closable alert dialog
+        support_dialog = ft.AlertDialog(
+            title=ft.Text("Support project"),
+            content=ft.Column(
+                controls=[
+
+                    ft.Text("Click on the options below to copy the details:", size=20),
+                    ft.Text("Contact: remusmaluss@gmail.com")
+                ] + support_items,  # Add the list of support options
+                alignment=ft.MainAxisAlignment.START
+            ),
+            actions=[
+                ft.TextButton("Close", on_click=self.close_alert)  # Button to close the alert
+            ],
+            actions_alignment=ft.MainAxisAlignment.END,
+        )
+
+        # Show the dialog
+        self.page.dialog = support_dialog
+        support_dialog.open = True
+        self.renderer.mark()
+    @event
+    def copy_to_clipboard(self, text):
+        self.page.set_clipboard(text)  # Copy the text to the clipboard
+        self.page.snack_bar = ft.SnackBar(ft.Text(f"Copied: {text}"),open=True, bgcolor=ft.colors.GREEN )  # Show a snackbar for confirmation
+        self.renderer.mark()
+
+    @event
+    def show_debug_panel(self, e):
+        # Timings collected so far, slowest total first
+        stats = sorted(self.instrumentation.stats().items(), key=lambda item: item[1]['total_ms'], reverse=True)
+        table = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Operation")),
+                ft.DataColumn(ft.Text("Count"), numeric=True),
+                ft.DataColumn(ft.Text("Total ms"), numeric=True),
+                ft.DataColumn(ft.Text("p50 ms"), numeric=True),
+                ft.DataColumn(ft.Text("p95 ms"), numeric=True),
+                ft.DataColumn(ft.Text("Controls"), numeric=True),
+            ],
+            rows=[
+                ft.DataRow(cells=[
+                    ft.DataCell(ft.Text(name)),
+                    ft.DataCell(ft.Text(str(op['count']))),
+                    ft.DataCell(ft.Text(f"{op['total_ms']:.1f}")),
+                    ft.DataCell(ft.Text(f"{op['p50_ms']:.2f}")),
+                    ft.DataCell(ft.Text(f"{op['p95_ms']:.2f}")),
+                    ft.DataCell(ft.Text(str(op.get('controls_max', '')))),
+                ])
+                for name, op in stats
+            ],
+        )
+        startup = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.startup_timings.items())
+        cache = self.ledger.summaries
+        cache_line = f"Month summaries cached: {len(cache)}/{cache.limit}, {cache.hits} hits, {cache.misses} misses"
+
+        debug_dialog = ft.AlertDialog(
+            title=ft.Text("Performance"),
+            content=ft.Column([ft.Text(f"Startup: {startup}"), ft.Text(cache_line), table], scroll=ft.ScrollMode.AUTO, height=500),
+            actions=[
+                ft.TextButton("Dump", on_click=self.dump_instrumentation),
+                ft.TextButton("Reset", on_click=self.reset_instrumentation),
+                ft.TextButton("Close", on_click=self.close_alert),
+            ],
+            actions_alignment=ft.MainAxisAlignment.END,
+        )
+        self.page.dialog = debug_dialog
+        debug_dialog.open = True
+        self.renderer.mark()
+
+    @event
+    def dump_instrumentation(self, e):
+        written = self.instrumentation.dump()
+        self.page.snack_bar = ft.SnackBar(ft.Text(f"Written: {', '.join(written)}"), open=True)
+        self.renderer.mark()
+
+    @event
+    def reset_instrumentation(self, e):
+        self.instrumentation.reset()
+        self.show_debug_panel(e)
+
+    @event
+    def close_alert(self, e):
+        self.page.dialog.open = False  # Close the dialog
+        self.renderer.mark()
+    def show_tab(self, *controls):
+        # Swaps the page content in place, sent with the event's single update
+        self.page.controls.clear()
+        self.page.controls.extend(controls)
+        self.renderer.mark()
+
+    @event
+    def show_dashboard(self, e):
+        self.show_tab(self.dashboard_content)
+    async def load_section_totals(self):
+        # Totals for every section and month come from one grouped read
+        async with self.busy():
+            self.section_month_totals = await self.data.section_totals()
+
+    def create_sections_layout(self):
+        sections_layout = ft.Column([], scroll=ft.ScrollMode.AUTO)
+        section_totals = self.section_month_totals
+        month = (int(self.year_dropdown.value), int(self.month_dropdown.value))
+        for section in self.sections:
+            section_card = self.create_section_card(section, section_totals.get(section['name'], {}).get(month, 0))
+            sections_layout.controls.append(section_card)
+        
+        # Add a button to create a new section
+        new_section_button = ft.ElevatedButton(
+            text="Add New Section",
+            on_click=self.add_new_section
+        )
+        sections_layout.controls.append(new_section_button)
+        
+        return sections_layout
+
+    def create_section_card(self, section, month_total=0):
+        balance = section['balance']
+
+        # Flet only awaits handlers that are coroutine functions themselves,
+        # a lambda returning a coroutine would be run and dropped
+        async def add(_):
+            await self.add_to_section(section, 'add')
+
+        async def subtract(_):
+            await self.add_to_section(section, 'subtract')
+
+        async def view_history(_):
+            await self.show_section_history(section)
+
+        return ft.Card(
+            content=ft.Container(
+                content=ft.Column([
+                    ft.Text(section['name'], size=20, weight=ft.FontWeight.BOLD),
+                    ft.Text(f"Balance: ${balance:.2f}", size=16),
+                    ft.Text(f"This month: ${month_total:.2f}", size=14),
+                    ft.Row([
+                        ft.TextField(label="Amount", width=150),
+                        ft.ElevatedButton(text="Add", on_click=add),
+                        ft.ElevatedButton(text="Subtract", on_click=subtract),
+                    ]),
+                    ft.ElevatedButton(text="View History", on_click=view_history),
+                ]),
+                padding=10
+            ),
+            margin=10
+        )
+
+    @event
+    async def add_to_section(self, section, operation):
+        amount_field = self.find_amount_field(section['name'])
+        try:
+            amount = float(amount_field.value)
+            year = int(self.year_dropdown.value)
+            month = int(self.month_dropdown.value)
+            day = date.today().day
+            
+            # Stores the entry and updates just this section's balance row
+            async with self.busy():
+                section['balance'] = await self.data.add_section_entry(
+                    section['name'], amount if operation == 'add' else -amount, year, month, day
+                )
+            await self.load_section_totals()
+            await self.prepare_view()  # The entry lands in the selected month
+            self.renderer.mark('sections', 'results', 'chart')
+            amount_field.value = ""
+        except ValueError:
+            self.page.snack_bar = ft.SnackBar(content=ft.Text("Please enter a valid number"))
+            self.page.snack_bar.open = True
+        self.renderer.mark()
+
+    def find_amount_field(self, section_name):
+        for control in self.sections_content.controls[-1].controls:
+            if isinstance(control, ft.Card) and control.content.content.controls[0].value == section_name:
+                return control.content.content.controls[3].controls[0]
+        return None
+
+    @event
+    async def show_section_history(self, section):
+        async with self.busy():
+            records = await self.data.section_records(section['name'])
+        records.sort(key=lambda r: (r['year'], r['month'], r['day']), reverse=True)
+
+        history_text = "\n".join([f"{r['day']}/{r['month']}/{r['year']}: ${r['amount']:.2f}" for r in records])
+
+        alert_dialog = ft.AlertDialog(
+            title=ft.Text(f"{section['name']} History"),
+            content=ft.Text(history_text),
+            actions=[
+                ft.TextButton("Close", on_click=self.close_dialog),
+            ],
+        )
+
+        self.page.dialog = alert_dialog
+        alert_dialog.open = True
+        self.renderer.mark()
+
+    @event
+    def close_dialog(self, e):
+        self.page.dialog.open = False
+        self.renderer.mark()
+
+    @event
+    def add_new_section(self, e):
+        async def save_new_section(e):
+            new_section_name = new_section_input.value
+            initial_balance = float(initial_balance_input.value) if initial_balance_input.value else 0
+            if new_section_name and not any(section['name'] == new_section_name for section in self.sections):
+                with self.renderer.batch():
+                    async with self.busy():
+                        balance = await self.data.add_section(new_section_name, initial_balance)
+                    self.sections.append({'name': new_section_name, 'balance': balance})
+                    self.page.dialog.open = False
+                    self.renderer.mark('sections')
+
+        new_section_input = ft.TextField(label="New Section Name")
+        initial_balance_input = ft.TextField(label="Initial Balance (optional)")
+        alert_dialog = ft.AlertDialog(
+            title=ft.Text("Add New Section"),
+            content=ft.Column([
+                new_section_input,
+                initial_balance_input,
+                ft.ElevatedButton(text="Save", on_click=save_new_section)
+            ]),
+        )
+
+        self.page.dialog = alert_dialog
+        alert_dialog.open = True
+        self.renderer.mark()
+
+    def update_sections_layout(self):
+        self.sections_content.controls[-1] = self.create_sections_layout()  # Replace the old sections layout
+
+    @event
+    async def show_sections(self, e):
+        await self.load_section_totals()
+        if self.sections_content is None:
+            self.build_sections_tab()
+        else:
+            self.renderer.mark('sections')  # Month totals follow the dashboard's year/month selection
+        self.show_tab(self.sections_content)
+
+    @event
+    async def show_history(self, e):
+        # The table is rebuilt here, so saves elsewhere don't need to touch it
+        if self.history_content is None:
+            self.build_history_tab()
+        await self.load_history_page()
+        self.renderer.mark('history')
+        self.show_tab(self.history_content)
+    @event
+    async def show_charts(self, e):
+        if self.charts_content is None:
+            self.build_charts_tab()
+        await self.prepare_view()
+        self.create_chart()  # Ensure the chart is created
+        self.renderer.mark('chart')  # Update the chart with data
+
+        # Handle navigation and zoom buttons
+        if self.chart_type in ("bar_chart", "range_chart"):
+            self.navigation_container.content = self.create_week_navigation_buttons()
+        else:
+            self.navigation_container.content = None
+
+        # The navigation container is empty for the line chart
+        self.show_tab(self.charts_content, self.navigation_container)
+
+
+    def update_results(self, e=None):
+        summary = self.summary
+        if summary is None:
+            return  # Ledger still loading
+
+        self.income_result.value = f"Monthly Income: ${summary.monthly_income:.2f}"
+        self.expense_result.value = f"Total Expenses: ${summary.total_expenses:.2f}"
+        self.additional_earning_result.value = f"Total Additional Earnings: ${summary.total_additional_earnings:.2f}"
+        self.balance_result.value = f"Current Balance: ${summary.balance:.2f}"
+        self.section_results.controls = [
+            ft.Text(f"📂 {name}: ${total:.2f}", size=16)
+            for name, total in sorted(summary.section_totals.items())
+        ]
+
+    @event
+    async def change_period(self, e):
+        await self.prepare_view()
+        self.renderer.mark('results', 'chart')
+        if self.year_content is not None and self.year_content in self.page.controls:
+            self.year_overview = await self.data.run(load_year_overview, int(self.year_dropdown.value))
+            self.renderer.mark('year')
+
+    def create_line_chart(self):
+        return ft.LineChart(
+            tooltip_bgcolor=ft.colors.with_opacity(0.8, ft.colors.WHITE),
+            expand=True,
+            left_axis=ft.ChartAxis(
+                title=ft.Text("Amount ($)"),
+                title_size=16,
+                labels_size=50,
+                labels_interval=1000,
+            ),
+            bottom_axis=ft.ChartAxis(title=ft.Text("Day of Month")),
+            top_axis=ft.ChartAxis(title=ft.Text("Financial Overview")),
+            right_axis=ft.ChartAxis(
+                title_size=16,
+                labels_size=50,
+                labels_interval=1000,
+            ),
+            # Income, expenses, additional earnings, balance
+            data_series=[
+                ft.LineChartData(color=color, stroke_width=width, curved=True, data_points=[])
+                for color, width in LINE_SERIES
+            ],
+        )
+
+    def update_chart(self):
+        if self.chart_with_zoom is None:
+            return  # Charts tab hasn't been opened yet
+        data = self.current_chart_data()
+        if data is None:
+            return  # Redrawn once prepare_view has loaded it
+
+        # Update the chart based on the chart type
+        if self.chart_type == "line_chart":
+            self.update_line_chart(data)
+        elif self.chart_type == "range_chart":
+            self.update_range_chart()
+        elif self.chart_type in ("year_chart", "years_chart"):
+            self.update_totals_chart()
+        elif self.chart_type == "bar_chart":
+            start_day = (self.current_week - 1) * 7 + 1
+            end_day = min(self.current_week * 7, data.days_in_month)
+            self.update_bar_chart(data, start_day, end_day)
+
+    def create_bar_chart(self):
+        # Seven day slots with their rods and labels, reused for every week
+        self.bar_groups = [
+            ft.BarChartGroup(
+                x=0,
+                bar_rods=[ft.BarChartRod(from_y=0, to_y=0, color=color) for _, color in BAR_SERIES],
+            )
+            for _ in range(7)
+        ]
+        self.bar_labels = [ft.ChartAxisLabel(value=0) for _ in range(7)]
+        return ft.BarChart(
+            bar_groups=[],
+            width=1000,
+            height=500,
+            left_axis=ft.ChartAxis(
+                title=ft.Text("Amount ($)"),
+                title_size=16,
+                labels_size=50,
+                labels_interval=250,
+            ),
+            bottom_axis=ft.ChartAxis(
+                title=ft.Text("Day of Month"),
+                title_size=16,
+                labels_size=50,
+                labels=[],
+            ),
+            horizontal_grid_lines=ft.ChartGridLines(
+                color=ft.colors.GREY_300,
+                interval=300,
+            ),
+            tooltip_bgcolor=ft.colors.with_opacity(0.8, ft.colors.WHITE),
+            interactive=True,
+            expand=True,
+        )
+
+    def update_bar_chart(self, summary, start_day, end_day):
+        # Ensure self.chart is a BarChart object
+        if not isinstance(self.chart, ft.BarChart):
+            print("Warning: self.chart is not a BarChart object.")
+            return
+
+        daily_income = summary.daily_income
+        daily_expenses = summary.daily_expenses
+        daily_additional_earnings = summary.daily_additional_earnings
+        balances = summary.balances
+
+        max_value = max(
+            [daily_income] + daily_expenses + daily_additional_earnings + balances
+        )
+
+        chart_max_y = max(1000, (max_value * self.zoom_level) + 250)
+        self.chart.max_y = chart_max_y
+        self.chart.left_axis.labels_interval = chart_max_y / 5
+
+        rod_width = 40 / (end_day - start_day + 1) * self.zoom_level
+
+        # Only values change, so Flet sends the changed attributes and nothing else
+        days = range(start_day, end_day + 1)
+        for group, label, day in zip(self.bar_groups, self.bar_labels, days):
+            group.x = day
+            label.value = day
+            amounts = (daily_income, daily_expenses[day-1], balances[day-1], daily_additional_earnings[day-1])
+            for rod, (name, _), amount in zip(group.bar_rods, BAR_SERIES, amounts):
+                rod.to_y = amount * self.zoom_level
+                rod.width = rod_width
+                rod.tooltip = f"{name}: ${amount:.2f}"
+        # Short last weeks drop the spare slots, the objects are kept for later
+        self.chart.bar_groups = self.bar_groups[:len(days)]
+        self.chart.bottom_axis.labels = self.bar_labels[:len(days)]
+
+    def update_line_chart(self, summary):
+        year, month = summary.year, summary.month
+        series = cumulative_series([summary])
+
+        self.chart.top_axis.title.value = f"Financial Overview - {month}/{year}"
+        # The balance line is the month's own, the same one the bar chart shows;
+        # only the range chart carries balances over from earlier months
+        values = (series.income, series.expenses, series.earnings, summary.balances)
+        for data, ys in zip(self.chart.data_series, values):
+            self.set_line_points(data, list(enumerate(ys)))
+
+    def range_bounds(self):
+        # First and last (year, month) of the range chart
+        end = shift_month(int(self.year_dropdown.value), int(self.month_dropdown.value), self.range_offset)
+        return shift_month(*end, 1 - self.range_months), end
+
+    def update_range_chart(self):
+        # Several years ending at the selected month. Every line is cut down
+        # to MAX_LINE_POINTS, so zooming in to a shorter span shows more detail.
+        start, end = self.range_bounds()
+        series = self.current_chart_data()
+
+        self.chart.top_axis.title.value = f"Financial Overview - {start[1]}/{start[0]} to {end[1]}/{end[0]}"
+        values = (series.income, series.expenses, series.earnings, series.balances)
+        for data, ys in zip(self.chart.data_series, values):
+            self.set_line_points(data, downsample(ys, MAX_LINE_POINTS))
+
+        # Years on long spans, months on short ones
+        yearly = self.range_months > 24
+        self.chart.bottom_axis.labels = [
+            ft.ChartAxisLabel(value=i, label=ft.Text(str(day.year) if yearly else f"{day.month}/{day.year % 100:02d}", size=12))
+            for i, day in enumerate(series.days)
+            if day.day == 1 and (day.month == 1 or not yearly)
+        ]
+
+    def set_line_points(self, data, xy):
+        # Moves the existing points, only a longer line adds new ones
+        points = data.data_points
+        for point, (x, y) in zip(points, xy):
+            point.x = x
+            point.y = y
+        if len(points) < len(xy):
+            points.extend(ft.LineChartDataPoint(x, y) for x, y in xy[len(points):])
+        else:
+            del points[len(xy):]
+
+    def create_totals_chart(self):
+        return ft.BarChart(
+            bar_groups=[],
+            width=1000,
+            height=500,
+            left_axis=ft.ChartAxis(
+                title=ft.Text("Amount ($)"),
+                title_size=16,
+                labels_size=50,
+            ),
+            bottom_axis=ft.ChartAxis(labels=[], labels_size=30),
+            top_axis=ft.ChartAxis(title=ft.Text("")),
+            horizontal_grid_lines=ft.ChartGridLines(color=ft.colors.GREY_300),
+            tooltip_bgcolor=ft.colors.with_opacity(0.8, ft.colors.WHITE),
+            interactive=True,
+            expand=True,
+        )
+
+    def update_totals_chart(self):
+        # Income, expenses, earnings and net per month of the selected year
+        # (Year Chart) or per year on record (Years Chart), from the rollups
+        totals = self.current_chart_data()
+        if self.chart_type == "year_chart":
+            year = int(self.year_dropdown.value)
+            periods = [((year, month), str(month)) for month in range(1, 13)]
+            self.chart.top_axis.title.value = f"Months of {year}"
+        else:
+            periods = [(year, str(year)) for year in sorted(totals)]
+            self.chart.top_axis.title.value = "All years"
+
+        groups = list(self.chart.bar_groups)
+        labels = list(self.chart.bottom_axis.labels)
+        while len(groups) < len(periods):
+            groups.append(ft.BarChartGroup(x=len(groups), bar_rods=[ft.BarChartRod(from_y=0, to_y=0, color=color) for _, color in TOTALS_SERIES]))
+            labels.append(ft.ChartAxisLabel(value=len(labels), label=ft.Text(size=12)))
+
+        max_value = 0
+        for group, label, (key, text) in zip(groups, labels, periods):
+            types = totals.get(key, {})
+            income, expenses, earnings = types.get('income', 0), types.get('expense', 0), types.get('additional_earning', 0)
+            amounts = (income, expenses, earnings, income + earnings - expenses)
+            for rod, (name, _), amount in zip(group.bar_rods, TOTALS_SERIES, amounts):
+                rod.to_y = amount * self.zoom_level
+                rod.width = 60 / len(periods)
+                rod.tooltip = f"{name}: ${amount:.2f}"
+            label.label.value = text
+            max_value = max(max_value, *amounts)
+
+        self.chart.max_y = max(1000, max_value * self.zoom_level * 1.1)
+        self.chart.min_y = min(0, min((rod.to_y for group in groups[:len(periods)] for rod in group.bar_rods), default=0))
+        self.chart.left_axis.labels_interval = self.chart.max_y / 5
+        self.chart.horizontal_grid_lines.interval = self.chart.max_y / 5
+        self.chart.bar_groups = groups[:len(periods)]
+        self.chart.bottom_axis.labels = labels[:len(periods)]
+
+    def create_chart_type_dropdown(self):
+        return ft.Dropdown(
+            label="Select Chart Type",
+            options=[
+                ft.dropdown.Option("Bar Chart"),
+                ft.dropdown.Option("Line Chart"),
+                ft.dropdown.Option("Range Chart"),
+                ft.dropdown.Option("Year Chart"),
+                ft.dropdown.Option("Years Chart"),
+            ],
+            value="Bar Chart",
+            on_change=self.set_chart_type,
+            width=200
+        )
+
+    @event
+    async def set_chart_type(self, e):
+        self.chart_type = e.control.value.lower().replace(" ", "_")
+        await self.prepare_view()
+        self.create_chart()  # Create the chart based on the new type, filled on render
+
+        # Update navigation buttons based on chart type
+        if self.chart_type in ("bar_chart", "range_chart"):
+            self.navigation_container.content = self.create_week_navigation_buttons()
+        else:
+            self.navigation_container.content = None
+        self.renderer.mark()
+
+
+
+    def create_history_row(self, record):
+        record_type = record['type'].capitalize()
+        amount = record['amount']
+        day = record.get('day', 'N/A')
+        month = record.get('month', 'N/A')
+        year = record.get('year', 'N/A')
+        return ft.DataRow(cells=[
+            ft.DataCell(ft.Text(record_type)),
+            ft.DataCell(ft.Text(f"${amount:.2f}")),
+            ft.DataCell(ft.Text(f"{day}/{month}/{year}")),
+        ])
+
+    def create_history_table(self):
+        # Only the first window of rows is built, the rest load on scroll
+        self.history_table = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Type")),
+                ft.DataColumn(ft.Text("Amount")),
+                ft.DataColumn(ft.Text("Date")),
+            ],
+            rows=[],
+        )
+        self.history_count_text = ft.Text()
+        self.history_load_more_button = ft.TextButton("Load more", on_click=self.load_more_history)
+        self.add_history_rows(self.history_first_page)
+
+        last_update = get_db_last_modified_time(self.ledger.path)
+
+        return ft.Column([
+            self.history_count_text,
+            self.history_table,
+            self.history_load_more_button,
+            ft.Text(f"Last database update: {last_update}")
+        ])
+
+    async def load_history_page(self):
+        # First window for the next table rebuild, read on the worker thread
+        async with self.busy():
+            self.history_first_page = await self.data.history(self.history_sort_order, 0, self.history_page_size)
+            self.history_total = await self.data.count()
+
+    def add_history_rows(self, records):
+        self.history_table.rows.extend(self.create_history_row(record) for record in records)
+        shown = len(self.history_table.rows)
+        self.history_count_text.value = f"Showing {shown} of {self.history_total} records"
+        self.history_load_more_button.visible = shown < self.history_total
+        self.renderer.mark()
+
+    @event
+    async def load_more_history(self, e=None):
+        # One window at a time: the offset is only read once the previous
+        # window is in, and a table rebuilt meanwhile doesn't get the rows
+        async with self.history_lock:
+            table, order = self.history_table, self.history_sort_order
+            async with self.busy():
+                records = await self.data.history(order, len(table.rows), self.history_page_size)
+                self.history_total = await self.data.count()
+            if table is self.history_table:
+                self.add_history_rows(records)
+
+    @event
+    async def on_history_scroll(self, e):
+        # Fetch the next window when the user gets close to the bottom
+        # (scroll events keep coming while a window loads, those are dropped)
+        if self.history_lock.locked():
+            return
+        if e.pixels >= e.max_scroll_extent - 200 and len(self.history_table.rows) < self.history_total:
+            await self.load_more_history(e)
+
+    def update_history(self):
+        self.history_list_view.controls.clear()
+        self.history_list_view.controls.append(self.create_history_table())
+
+    @event
+    async def zoom_in(self, e):
+        if self.chart_type == "range_chart":
+            self.range_months = max(self.range_months // 2, RANGE_MONTHS_MIN)
+        else:
+            self.zoom_level = min(self.zoom_level * 1.2, self.max_zoom)
+        await self.prepare_view()
+        self.renderer.mark('chart')
+
+    @event
+    async def zoom_out(self, e):
+        if self.chart_type == "range_chart":
+            self.range_months = min(self.range_months * 2, RANGE_MONTHS_MAX)
+        else:
+            self.zoom_level = max(self.zoom_level / 1.2, self.min_zoom)
+        await self.prepare_view()
+        self.renderer.mark('chart')
+    def create_week_navigation_buttons(self):
+        self.navigation_buttons_row = ft.Row(
+            [
+                ft.IconButton(icon=ft.icons.ARROW_LEFT, on_click=self.previous_week),
+                ft.IconButton(icon=ft.icons.ARROW_RIGHT, on_click=self.next_week),
+                ft.IconButton(icon=ft.icons.REMOVE, on_click=self.zoom_out),
+                ft.IconButton(icon=ft.icons.ADD, on_click=self.zoom_in),
+            ],
+            alignment=ft.MainAxisAlignment.CENTER,
+            spacing=10,
+        )
+        return self.navigation_buttons_row
+
+
+
+
+    @event
+    async def previous_week(self, _):
+        if self.chart_type == "range_chart":
+            self.range_offset -= max(self.range_months // 2, 1)  # Pan by half the span
+            await self.prepare_view()
+            self.renderer.mark('chart')
+        elif self.current_week > 1:
+            self.current_week -= 1
+            await self.prepare_view()
+            self.renderer.mark('chart')
+
+    @event
+    async def next_week(self, _):
+        if self.chart_type == "range_chart":
+            self.range_offset += max(self.range_months // 2, 1)
+            await self.prepare_view()
+            self.renderer.mark('chart')
+            return
+        year = int(self.year_dropdown.value)
+        month = int(self.month_dropdown.value)
+        days_in_month = get_days_in_month(year, month)
+        max_weeks = (days_in_month + 6) // 7
+        if self.current_week < max_weeks:
+            self.current_week += 1
+            await self.prepare_view()
+            self.renderer.mark('chart')
+
+    @event
+    async def save_income(self, e):
+        try:
+            income = float(self.income_input.value)
+            year = int(self.year_dropdown.value)
+            month = int(self.month_dropdown.value)
+            async with self.busy():
+                await self.data.upsert({'type': 'income', 'amount': income, 'year': year, 'month': month})
+            await self.prepare_view()
+            self.renderer.mark('results', 'chart')
+        except ValueError:
+            self.income_result.value = "Please enter a valid number"
+            self.renderer.mark()
+
+
+
+
+
+    @event
+    async def save_expense(self, e):
+        try:
+            expense = float(self.expense_input.value)
+            if self.day_dropdown.value is None:
+                raise ValueError("Day must be selected.")
+            day = int(self.day_dropdown.value)
+            year = int(self.year_dropdown.value)
+            month = int(self.month_dropdown.value)
+            section = self.section_dropdown.value  # Add a dropdown for selecting the section
+            async with self.busy():
+                await self.data.insert({'type': 'expense', 'amount': expense, 'day': day, 'year': year, 'month': month, 'section': section})
+            await self.prepare_view()
+            self.renderer.mark('results', 'chart')
+        except ValueError as ve:
+            self.expense_result.value = str(ve)
+            self.renderer.mark()
+
+
+    @event
+    async def save_additional_earning(self, e):
+            try:
+                earning = float(self.additional_earning_input.value)
+                day = int(self.additional_earning_day_dropdown.value)
+                year = int(self.year_dropdown.value)
+                month = int(self.month_dropdown.value)
+                section = self.section_dropdown.value  # Add a dropdown for selecting the section
+                async with self.busy():
+                    await self.data.insert({'type': 'additional_earning', 'amount': earning, 'day': day, 'year': year, 'month': month, 'section': section})
+                await self.prepare_view()
+                self.renderer.mark('results', 'chart')
+            except ValueError:
+                self.additional_earning_result.value = "Please enter a valid number"
+                self.renderer.mark()
+    @event
+    async def save_expense_or_earning(self, e):
+        try:
+            year = int(self.year_dropdown.value)
+            month = int(self.month_dropdown.value)
+
+            if self.expense_input.value:
+                expense = float(self.expense_input.value)
+                if self.day_dropdown.value is None:
+                    raise ValueError("Day must be selected for expense.")
+                day = int(self.day_dropdown.value)
+                async with self.busy():
+                    await self.data.insert({'type': 'expense', 'amount': expense, 'day': day, 'year': year, 'month': month})
+                self.expense_input.value = ""
+                self.day_dropdown.value = None
+
+            if self.additional_earning_input.value:
+                earning = float(self.additional_earning_input.value)
+                if self.additional_earning_day_dropdown.value is None:
+                    raise ValueError("Day must be selected for additional earning.")
+                day = int(self.additional_earning_day_dropdown.value)
+                async with self.busy():
+                    await self.data.insert({'type': 'additional_earning', 'amount': earning, 'day': day, 'year': year, 'month': month})
+                self.additional_earning_input.value = ""
+                self.additional_earning_day_dropdown.value = None
+
+            await self.prepare_view()
+            self.renderer.mark('results', 'chart')
+        except ValueError as ve:
+            self.expense_result.value = str(ve)
+            self.additional_earning_result.value = str(ve)
+            self.renderer.mark()
+
+def main(page: ft.Page):
+    ExpenseTrackerApp(page)
+
+def run():
+    ft.app(target=main)
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,48 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from .storage import open_ledger
+
+
+class AsyncLedger:
+    # asyncio front end for Ledger / SqliteLedger. Every call runs on one
+    # worker thread, so the event loop never waits on disk or aggregation,
+    # calls reach the ledger one at a time and writes keep their order.
+    # Attributes that aren't methods (path, records, ...) are read directly.
+    def __init__(self, ledger, executor=None):
+        self.ledger = ledger
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix='ledger')
+
+    async def call(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(getattr(self.ledger, method), *args, **kwargs)
+        )
+
+    async def run(self, fn, *args):
+        # Any blocking function of the ledger, e.g. a few reads done together
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, self.ledger, *args)
+
+    async def count(self):
+        return await self.run(len)
+
+    def __getattr__(self, name):
+        attr = getattr(self.ledger, name)
+        if not callable(attr):
+            return attr
+        return functools.partial(self.call, name)
+
+    async def close(self):
+        await self.call('close')
+        self.executor.shutdown(wait=False)
+
+
+async def open_async_ledger(backend=None, path=None, batch_seconds=0):
+    # open_ledger on the worker thread; loading a large ledger is the
+    # slowest call of all
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ledger')
+    loop = asyncio.get_running_loop()
+    ledger = await loop.run_in_executor(executor, functools.partial(open_ledger, backend, path, batch_seconds))
+    return AsyncLedger(ledger, executor)
@@ -0,0 +1,69 @@
+import atexit
+import json
+import os
+import threading
+
+
+class WriteBatcher:
+    # Holds new records in memory and hands them to `write` in groups: when
+    # `max_batch` records are waiting, `interval` seconds after the first
+    # one arrived, or at interpreter exit. Every queued record is appended
+    # to `pending_path` first (a few bytes plus fsync), so a crash before the
+    # flush can be replayed with `recover` on the next start.
+    def __init__(self, write, pending_path=None, interval=2.0, max_batch=50):
+        self.write = write
+        self.pending_path = pending_path
+        self.interval = interval
+        self.max_batch = max_batch
+        self.queue = []
+        self.lock = threading.RLock()
+        self.timer = None
+        atexit.register(self.flush)
+
+    def add(self, doc_id, record):
+        with self.lock:
+            if self.pending_path:
+                with open(self.pending_path, 'a', encoding='utf-8') as pending:
+                    pending.write(json.dumps({'id': doc_id, 'record': record}) + '\n')
+                    pending.flush()
+                    os.fsync(pending.fileno())
+            self.queue.append((doc_id, record))
+
+            if len(self.queue) >= self.max_batch:
+                self.flush()
+            elif self.timer is None:
+                self.timer = threading.Timer(self.interval, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.queue:
+                return
+            self.write(self.queue)
+            self.queue = []
+            # Only forget the pending copies once the storage has them
+            if self.pending_path and os.path.exists(self.pending_path):
+                os.remove(self.pending_path)
+
+    def close(self):
+        self.flush()
+        atexit.unregister(self.flush)
+
+
+def recover(pending_path):
+    # (doc_id, record) pairs left behind by a run that never flushed
+    if not pending_path or not os.path.exists(pending_path):
+        return []
+    entries = []
+    with open(pending_path, encoding='utf-8') as pending:
+        for line in pending:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break  # torn write, nothing after it was acknowledged
+            entries.append((entry['id'], entry['record']))
+    return entries
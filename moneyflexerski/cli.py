@@ -0,0 +1,145 @@
+import argparse
+import json
+import sys
+from datetime import date
+
+from .exporter import export_ledger
+from .importer import DEFAULT_CSV_MAPPING, import_file
+from .series import iter_months
+from .storage import DEFAULT_PATHS, open_ledger, open_rollup
+
+
+def _month(value):
+    # YYYY-MM
+    try:
+        year, month = value.split('-')
+        year, month = int(year), int(month)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM, got {value!r}")
+    if not 1 <= month <= 12:
+        raise argparse.ArgumentTypeError(f"month must be 01 to 12, got {value!r}")
+    return year, month
+
+
+def cmd_summary(ledger, args):
+    return ledger.month_summary(args.year, args.month).as_dict(daily=args.daily)
+
+
+def cmd_range(ledger, args):
+    # Read from the rollups, so a long range costs one lookup per month
+    # rather than a summary built from every record
+    monthly = ledger.monthly_totals(args.start, args.end)
+    months = []
+    totals = {'monthly_income': 0, 'total_expenses': 0, 'total_additional_earnings': 0, 'balance': 0}
+    for year, month in iter_months(args.start, args.end):
+        types = monthly.get((year, month), {})
+        income = types.get('income', 0)
+        expenses = types.get('expense', 0)
+        earnings = types.get('additional_earning', 0)
+        summary = {
+            'year': year,
+            'month': month,
+            'monthly_income': income,
+            'total_expenses': expenses,
+            'total_additional_earnings': earnings,
+            'balance': income + earnings - expenses,
+        }
+        months.append(summary)
+        for key in totals:
+            totals[key] += summary[key]
+    return {'start': '%d-%02d' % args.start, 'end': '%d-%02d' % args.end, 'months': months, 'totals': totals}
+
+
+def cmd_top(ledger, args):
+    return [dict(record) for record in ledger.top_records(args.n, args.type, args.year, args.month)]
+
+
+def cmd_sections(ledger, args):
+    totals = ledger.section_totals()
+    return [
+        {
+            'name': section['name'],
+            'balance': section['balance'],
+            'months': {'%d-%02d' % month: total for month, total in sorted(totals.get(section['name'], {}).items())},
+        }
+        for section in ledger.load_sections()
+    ]
+
+
+def cmd_import(ledger, args):
+    mapping = {key: getattr(args, key) for key in DEFAULT_CSV_MAPPING if getattr(args, key, None) is not None}
+    report = import_file(ledger, args.path, mapping)
+    ledger.flush()
+    return report.as_dict()
+
+
+def cmd_export(ledger, args):
+    count = export_ledger(
+        ledger, args.path, year=args.year, month=args.month, record_type=args.type, section=args.section
+    )
+    return {'path': args.path, 'records': count}
+
+
+def build_parser():
+    today = date.today()
+    parser = argparse.ArgumentParser(prog='moneyflexerski', description="Reports and bulk operations on the MoneyFlexerski ledger")
+    parser.add_argument('--backend', choices=sorted(DEFAULT_PATHS), help="storage backend (default: $MONEYFLEXERSKI_STORAGE or journal)")
+    parser.add_argument('--db', help="database file (default: $MONEYFLEXERSKI_DB or the backend's default)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    summary = commands.add_parser('summary', help="totals, balance and section totals for one month")
+    summary.add_argument('--year', type=int, default=today.year)
+    summary.add_argument('--month', type=int, default=today.month)
+    summary.add_argument('--daily', action='store_true', help="include the per-day series the charts use")
+    summary.set_defaults(handler=cmd_summary)
+
+    report = commands.add_parser('range', help="month by month totals between two months (inclusive)")
+    report.add_argument('start', type=_month, metavar='YYYY-MM')
+    report.add_argument('end', type=_month, metavar='YYYY-MM')
+    report.set_defaults(handler=cmd_range, opener=open_rollup)  # Totals only, the saved rollup will do
+
+    top = commands.add_parser('top', help="largest transactions")
+    top.add_argument('-n', type=int, default=10)
+    top.add_argument('--type', default='expense', choices=['expense', 'additional_earning', 'section_entry'])
+    top.add_argument('--year', type=int)
+    top.add_argument('--month', type=int)
+    top.set_defaults(handler=cmd_top)
+
+    sections = commands.add_parser('sections', help="section balances and per-month totals")
+    sections.set_defaults(handler=cmd_sections)
+
+    importer = commands.add_parser('import', help="bulk import a bank CSV or OFX statement")
+    importer.add_argument('path')
+    importer.add_argument('--date', help="CSV date column (default: Date)")
+    importer.add_argument('--amount', help="CSV amount column (default: Amount)")
+    importer.add_argument('--type', help="CSV column holding expense/additional_earning")
+    importer.add_argument('--section', help="CSV column mapped to the section")
+    importer.add_argument('--date-format', dest='date_format', help="strptime format (default: %%Y-%%m-%%d)")
+    importer.add_argument('--delimiter')
+    importer.add_argument('--decimal', help="decimal mark, e.g. ','")
+    importer.set_defaults(handler=cmd_import)
+
+    exporter = commands.add_parser('export', help="stream records to .csv, .mfcol or .parquet")
+    exporter.add_argument('path')
+    exporter.add_argument('--year', type=int)
+    exporter.add_argument('--month', type=int)
+    exporter.add_argument('--type')
+    exporter.add_argument('--section')
+    exporter.set_defaults(handler=cmd_export)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    opener = getattr(args, 'opener', open_ledger)
+    ledger = opener(args.backend, args.db)
+    try:
+        result = args.handler(ledger, args)
+    except (OSError, ValueError, RuntimeError) as error:
+        print(json.dumps({'error': str(error)}), file=sys.stderr)
+        return 1
+    finally:
+        ledger.close()
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+    return 0
@@ -0,0 +1,251 @@
+from array import array
+from itertools import compress
+
+try:
+    import numpy as np
+except ImportError:  # Optional: the plain loops below give the same answers, just slower
+    np = None
+
+from .exporter import read_columnar
+from .ledger import RECORD_TYPES
+from .summary import summarize_columns
+
+# Array columns and the record field each one holds
+COLUMN_FIELDS = (
+    ('amounts', 'amount'),
+    ('days', 'day'),
+    ('years', 'year'),
+    ('months', 'month'),
+    ('types', 'type'),
+    ('sections', 'section'),
+)
+
+
+def _month_index(year, month):
+    return year * 12 + month
+
+
+class ColumnStore:
+    # Column-oriented copy of a ledger for reports over many records: one
+    # typed array per field, with type and section names interned to small
+    # codes. A record costs 19 bytes here (15 in the columns, 4 for its
+    # row number in by_month) against the best part of a kilobyte as a
+    # TinyDB Document. Filters and group sums run on NumPy
+    # views of the arrays when NumPy is installed and as loops over the
+    # arrays otherwise. The store is a snapshot; rebuild it after writes.
+    def __init__(self):
+        self.amounts = array('d')
+        self.days = array('B')      # 0 for records without a day (income)
+        self.years = array('H')
+        self.months = array('B')
+        self.types = array('B')
+        self.sections = array('H')  # 0 for records without a section
+        self.type_names = list(RECORD_TYPES)
+        self.section_names = ['']
+        self.codes = {
+            'type': {name: code for code, name in enumerate(self.type_names)},
+            'section': {'': 0},
+        }
+        self.by_month = {}  # (year, month) -> array of row numbers
+
+    @classmethod
+    def from_records(cls, records):
+        store = cls()
+        store.extend(records)
+        return store
+
+    @classmethod
+    def from_ledger(cls, ledger, **filters):
+        # Streams the ledger through iter_records, so only the arrays are kept
+        return cls.from_records(ledger.iter_records(**filters))
+
+    @classmethod
+    def from_columnar(cls, path):
+        # Loads an export_columnar (.mfcol) file
+        return cls.from_records(read_columnar(path))
+
+    def _intern(self, kind, name):
+        codes = self.codes[kind]
+        code = codes.get(name)
+        if code is None:
+            names = self.type_names if kind == 'type' else self.section_names
+            code = codes[name] = len(names)
+            names.append(name)
+        return code
+
+    def append(self, record):
+        year, month = record['year'], record['month']
+        self.by_month.setdefault((year, month), array('I')).append(len(self.amounts))
+        self.amounts.append(record.get('amount', 0))
+        self.days.append(record.get('day') or 0)
+        self.years.append(year)
+        self.months.append(month)
+        self.types.append(self._intern('type', record.get('type')))
+        self.sections.append(self._intern('section', record.get('section') or ''))
+
+    def extend(self, records):
+        count = len(self.amounts)
+        for record in records:
+            self.append(record)
+        return len(self.amounts) - count
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def nbytes(self):
+        # Memory held by the columns and the month index, names aside
+        arrays = [getattr(self, name) for name, _ in COLUMN_FIELDS] + list(self.by_month.values())
+        return sum(len(column) * column.itemsize for column in arrays)
+
+    def record(self, row):
+        # One row back as the dict the ledgers hand out
+        record = {'type': self.type_names[self.types[row]], 'amount': self.amounts[row]}
+        if self.days[row]:
+            record['day'] = self.days[row]
+        record['year'] = self.years[row]
+        record['month'] = self.months[row]
+        section = self.section_names[self.sections[row]]
+        if section:
+            record['section'] = section
+        return record
+
+    def _view(self, name):
+        # NumPy view over an array column. Views are only used inside a call:
+        # an array can't grow while one is alive.
+        column = getattr(self, name)
+        return np.frombuffer(column, dtype=column.typecode) if np is not None else column
+
+    def mask(self, year=None, month=None, record_type=None, section=None):
+        # Rows matching every given filter: a NumPy bool array, or a bytearray
+        # of 0/1 without NumPy. Unknown names match nothing.
+        conditions = []
+        for name, value in (('years', year), ('months', month)):
+            if value is not None:
+                conditions.append((name, value))
+        for name, kind, value in (('types', 'type', record_type), ('sections', 'section', section)):
+            if value is not None:
+                conditions.append((name, self.codes[kind].get(value, -1)))
+
+        size = len(self.amounts)
+        if np is not None:
+            mask = np.ones(size, dtype=bool)
+            for name, value in conditions:
+                mask &= self._view(name) == value
+            return mask
+        mask = bytearray(b'\x01') * size
+        for name, value in conditions:
+            mask = bytearray(map(min, mask, map(value.__eq__, getattr(self, name))))
+        return mask
+
+    def rows(self, **filters):
+        # Row numbers matching the filters, in store order
+        if not filters:
+            return range(len(self.amounts))
+        if filters.get('year') is not None and filters.get('month') is not None and len(filters) == 2:
+            return self.by_month.get((filters['year'], filters['month']), array('I'))
+        mask = self.mask(**filters)
+        if np is not None:
+            return np.flatnonzero(mask)
+        return list(compress(range(len(mask)), mask))
+
+    def iter_records(self, **filters):
+        for row in self.rows(**filters):
+            yield self.record(int(row))
+
+    def total(self, **filters):
+        if np is not None:
+            return float(self._view('amounts')[self.mask(**filters)].sum())
+        return sum(compress(self.amounts, self.mask(**filters)))
+
+    def _group_sums(self, keys, weights):
+        # {key: summed weight} for parallel sequences of keys and weights
+        if np is not None:
+            if not len(keys):
+                return {}
+            unique, inverse = np.unique(keys, return_inverse=True)
+            sums = np.bincount(inverse, weights=weights)
+            return dict(zip(unique.tolist(), sums.tolist()))
+        sums = {}
+        for key, weight in zip(keys, weights):
+            sums[key] = sums.get(key, 0) + weight
+        return sums
+
+    def type_totals(self, **filters):
+        # {type: total} over the matching rows
+        if np is not None:
+            mask = self.mask(**filters)
+            sums = self._group_sums(self._view('types')[mask], self._view('amounts')[mask])
+        else:
+            rows = self.rows(**filters)
+            sums = self._group_sums([self.types[row] for row in rows], [self.amounts[row] for row in rows])
+        return {self.type_names[code]: total for code, total in sums.items()}
+
+    def monthly_totals(self, start, end):
+        # {(year, month): {type: total}}, both ends inclusive, as the rollups give it
+        low, high = _month_index(*start), _month_index(*end)
+        width = len(self.type_names)
+        if np is not None:
+            months = self._view('years').astype(np.int64) * 12 + self._view('months')
+            mask = (months >= low) & (months <= high)
+            keys = months[mask] * width + self._view('types')[mask]
+            sums = self._group_sums(keys, self._view('amounts')[mask])
+        else:
+            keys, weights = [], []
+            for year, month, record_type, amount in zip(self.years, self.months, self.types, self.amounts):
+                index = _month_index(year, month)
+                if low <= index <= high:
+                    keys.append(index * width + record_type)
+                    weights.append(amount)
+            sums = self._group_sums(keys, weights)
+
+        totals = {}
+        for key, total in sorted(sums.items()):
+            index, code = divmod(key, width)
+            year, month = divmod(index - 1, 12)
+            totals.setdefault((year, month + 1), {})[self.type_names[code]] = total
+        return totals
+
+    def section_totals(self):
+        # {section: {(year, month): total}}, earnings up and expenses down,
+        # the same shape as Ledger.section_totals
+        expense = self.codes['type']['expense']
+        width = len(self.section_names)
+        if np is not None:
+            mask = self._view('sections') > 0
+            amounts = self._view('amounts')[mask]
+            signed = np.where(self._view('types')[mask] == expense, -amounts, amounts)
+            months = self._view('years')[mask].astype(np.int64) * 12 + self._view('months')[mask]
+            sums = self._group_sums(months * width + self._view('sections')[mask], signed)
+        else:
+            keys, weights = [], []
+            for row, section in enumerate(self.sections):
+                if section:
+                    keys.append(_month_index(self.years[row], self.months[row]) * width + section)
+                    amount = self.amounts[row]
+                    weights.append(-amount if self.types[row] == expense else amount)
+            sums = self._group_sums(keys, weights)
+
+        totals = {}
+        for key, total in sums.items():
+            index, code = divmod(key, width)
+            year, month = divmod(index - 1, 12)
+            totals.setdefault(self.section_names[code], {})[(year, month + 1)] = total
+        return totals
+
+    def month_summary(self, year, month):
+        return self.month_summaries([(year, month)])[0]
+
+    def month_summaries(self, months):
+        # The MonthSummary objects the ledgers build, for many months in one
+        # summarize_columns call straight off the arrays
+        months = list(months)
+        row_lists = [self.by_month.get(month, array('I')) for month in months]
+        if np is not None:
+            rows = np.concatenate([np.frombuffer(rows, dtype=np.uint32) for rows in row_lists] or [np.zeros(0, np.uint32)])
+            slots = np.repeat(np.arange(len(months)), [len(rows) for rows in row_lists])
+            columns = [self._view(name)[rows] for name in ('days', 'types', 'amounts', 'sections')]
+        else:
+            rows = [row for rows in row_lists for row in rows]
+            slots = [slot for slot, rows in enumerate(row_lists) for _ in rows]
+            columns = [[column[row] for row in rows] for column in (self.days, self.types, self.amounts, self.sections)]
+        return summarize_columns(months, slots, *columns, self.type_names, self.section_names)
@@ -0,0 +1,139 @@
+import csv
+import json
+import struct
+import sys
+from array import array
+from itertools import islice
+
+# The record schema save_expense_or_earning, save_income and add_to_section write
+COLUMNS = ('type', 'amount', 'day', 'year', 'month', 'section')
+
+COLUMNAR_MAGIC = b'MFCOL1\n'
+ROW_GROUP_SIZE = 65536
+
+
+def export_csv(records, path):
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for record in records:
+            writer.writerow([record.get(column, '') for column in COLUMNS])
+            count += 1
+    return count
+
+
+def _encode_group(records):
+    # One row group: fixed-width arrays per column, strings dictionary-encoded
+    amounts, days, years, months = array('d'), array('B'), array('H'), array('B')
+    types, sections = array('H'), array('H')
+    dictionaries = {'type': {}, 'section': {}}
+    for record in records:
+        amounts.append(record['amount'])
+        days.append(record.get('day') or 0)
+        years.append(record['year'])
+        months.append(record['month'])
+        types.append(dictionaries['type'].setdefault(record['type'], len(dictionaries['type'])))
+        section = record.get('section') or ''
+        sections.append(dictionaries['section'].setdefault(section, len(dictionaries['section'])))
+
+    columns = [amounts, days, years, months, types, sections]
+    if sys.byteorder != 'little':
+        for column in columns:
+            column.byteswap()
+    meta = {
+        'rows': len(amounts),
+        'dictionaries': {name: list(values) for name, values in dictionaries.items()},
+        'columns': [[name, column.typecode, len(column) * column.itemsize]
+                    for name, column in zip(('amount', 'day', 'year', 'month', 'type', 'section'), columns)],
+    }
+    header = json.dumps(meta).encode('utf-8')
+    return struct.pack('<I', len(header)) + header + b''.join(column.tobytes() for column in columns)
+
+
+def export_columnar(records, path):
+    # Compact column-oriented file written ROW_GROUP_SIZE rows at a time, so
+    # memory stays flat however many records are exported
+    count = 0
+    records = iter(records)
+    with open(path, 'wb') as f:
+        f.write(COLUMNAR_MAGIC)
+        while True:
+            group = list(islice(records, ROW_GROUP_SIZE))
+            if not group:
+                break
+            f.write(_encode_group(group))
+            count += len(group)
+    return count
+
+
+def read_columnar(path):
+    # Streams records back out of an export_columnar file
+    with open(path, 'rb') as f:
+        if f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError(f"{path} is not a MoneyFlexerski columnar file")
+        while True:
+            size = f.read(4)
+            if not size:
+                return
+            meta = json.loads(f.read(struct.unpack('<I', size)[0]))
+            columns = {}
+            for name, typecode, nbytes in meta['columns']:
+                column = array(typecode)
+                column.frombytes(f.read(nbytes))
+                if sys.byteorder != 'little':
+                    column.byteswap()
+                columns[name] = column
+            type_names = meta['dictionaries']['type']
+            section_names = meta['dictionaries']['section']
+            for i in range(meta['rows']):
+                record = {'type': type_names[columns['type'][i]], 'amount': columns['amount'][i]}
+                if columns['day'][i]:
+                    record['day'] = columns['day'][i]
+                record['year'] = columns['year'][i]
+                record['month'] = columns['month'][i]
+                section = section_names[columns['section'][i]]
+                if section:
+                    record['section'] = section
+                yield record
+
+
+def export_parquet(records, path):
+    # pyarrow is optional and slow to import, so it is only loaded here
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow), use the .mfcol format instead")
+    schema = pa.schema([
+        ('type', pa.string()), ('amount', pa.float64()), ('day', pa.uint8()),
+        ('year', pa.uint16()), ('month', pa.uint8()), ('section', pa.string()),
+    ])
+    count = 0
+    records = iter(records)
+    with pq.ParquetWriter(path, schema) as writer:
+        while True:
+            group = list(islice(records, ROW_GROUP_SIZE))
+            if not group:
+                break
+            writer.write_table(pa.Table.from_pylist(
+                [{column: record.get(column) for column in COLUMNS} for record in group], schema=schema
+            ))
+            count += len(group)
+    return count
+
+
+EXPORTERS = {
+    '.csv': export_csv,
+    '.mfcol': export_columnar,
+    '.parquet': export_parquet,
+}
+
+
+def export_ledger(ledger, path, **filters):
+    # Picks the format from the file extension; filters are passed to
+    # ledger.iter_records (year, month, record_type, section)
+    for extension, exporter in EXPORTERS.items():
+        if path.lower().endswith(extension):
+            return exporter(ledger.iter_records(**filters), path)
+    raise ValueError(f"Don't know how to export to {path}, use one of {', '.join(EXPORTERS)}")
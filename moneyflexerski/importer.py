@@ -0,0 +1,155 @@
+import csv
+import time
+from collections import Counter
+from datetime import datetime
+
+# Column mapping for bank CSV exports. Only `date` and `amount` are required;
+# without a `type` column, negative amounts become expenses and positive
+# ones additional earnings.
+DEFAULT_CSV_MAPPING = {
+    'date': 'Date',
+    'amount': 'Amount',
+    'type': None,
+    'section': None,
+    'date_format': '%Y-%m-%d',
+    'delimiter': ',',
+    'decimal': '.',
+    'encoding': 'utf-8-sig',
+}
+
+RECORD_TYPES = ('expense', 'additional_earning')
+
+
+class ImportReport:
+    def __init__(self):
+        self.read = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.skipped = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.read / self.seconds if self.seconds else 0.0
+
+    def as_dict(self):
+        return {
+            'read': self.read,
+            'imported': self.imported,
+            'duplicates': self.duplicates,
+            'skipped': self.skipped,
+            'seconds': round(self.seconds, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+        }
+
+    def __str__(self):
+        return (f"{self.imported} imported, {self.duplicates} duplicates, {self.skipped} skipped "
+                f"of {self.read} rows in {self.seconds:.2f}s ({self.rows_per_second:.0f} rows/s)")
+
+
+def make_record(when, amount, record_type=None, section=None):
+    # Same shape save_expense_or_earning writes
+    if record_type not in RECORD_TYPES:
+        record_type = 'expense' if amount < 0 else 'additional_earning'
+    record = {'type': record_type, 'amount': abs(amount), 'day': when.day, 'year': when.year, 'month': when.month}
+    if section:
+        record['section'] = section
+    return record
+
+
+def read_csv(path, mapping=None):
+    # Yields records one row at a time, or None for rows that can't be parsed
+    mapping = {**DEFAULT_CSV_MAPPING, **(mapping or {})}
+    with open(path, newline='', encoding=mapping['encoding']) as f:
+        for row in csv.DictReader(f, delimiter=mapping['delimiter']):
+            try:
+                when = datetime.strptime(row[mapping['date']].strip(), mapping['date_format'])
+                raw_amount = row[mapping['amount']].strip().replace(' ', '')
+                if mapping['decimal'] != '.':
+                    raw_amount = raw_amount.replace('.', '').replace(mapping['decimal'], '.')
+                amount = float(raw_amount.replace(',', ''))
+            except (KeyError, ValueError, AttributeError):
+                yield None
+                continue
+            record_type = row.get(mapping['type']) if mapping['type'] else None
+            section = row.get(mapping['section']) if mapping['section'] else None
+            yield make_record(when, amount, record_type and record_type.strip().lower(), section and section.strip())
+
+
+def _ofx_tags(f, chunk_size=65536):
+    # (TAG, value) pairs from an OFX file, read a chunk at a time. Handles
+    # both SGML (OFX 1.x, unclosed leaf tags) and XML (OFX 2.x) statements.
+    buffer = ''
+    while True:
+        chunk = f.read(chunk_size)
+        buffer += chunk
+        parts = buffer.split('<')
+        # The last part may continue in the next chunk
+        buffer = parts.pop() if chunk else ''
+        for part in parts:
+            tag, _, value = part.partition('>')
+            if tag:
+                yield tag.strip().upper(), value.strip()
+        if not chunk:
+            return
+
+
+def read_ofx(path):
+    with open(path, encoding='utf-8', errors='replace') as f:
+        transaction = None
+        for tag, value in _ofx_tags(f):
+            if tag == 'STMTTRN':
+                transaction = {}
+            elif tag == '/STMTTRN' and transaction is not None:
+                try:
+                    when = datetime.strptime(transaction['DTPOSTED'][:8], '%Y%m%d')
+                    amount = float(transaction['TRNAMT'].replace(',', '.'))
+                except (KeyError, ValueError):
+                    yield None
+                else:
+                    yield make_record(when, amount)
+                transaction = None
+            elif transaction is not None and not tag.startswith('/'):
+                transaction[tag] = value
+
+
+def _dedup_key(record):
+    return (record['type'], round(record['amount'], 2), record['year'], record['month'], record['day'])
+
+
+def import_records(ledger, rows, report=None):
+    # Streams parsed rows into one bulk insert, dropping rows that match a
+    # record already in the ledger. Existing keys are loaded one month at a
+    # time from the ledger index, so memory follows the months touched, not
+    # the size of the statement.
+    report = report or ImportReport()
+    existing = {}  # (year, month) -> Counter of record keys
+    started = time.perf_counter()
+
+    def new_records():
+        for record in rows:
+            report.read += 1
+            if record is None:
+                report.skipped += 1
+                continue
+            month = (record['year'], record['month'])
+            if month not in existing:
+                existing[month] = Counter(
+                    _dedup_key(doc) for record_type in RECORD_TYPES for doc in ledger.search(record_type, *month)
+                )
+            key = _dedup_key(record)
+            if existing[month][key]:
+                existing[month][key] -= 1
+                report.duplicates += 1
+                continue
+            report.imported += 1
+            yield record
+
+    ledger.insert_multiple(new_records())
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def import_file(ledger, path, mapping=None):
+    rows = read_ofx(path) if path.lower().endswith(('.ofx', '.qfx')) else read_csv(path, mapping)
+    return import_records(ledger, rows)
@@ -0,0 +1,158 @@
+import atexit
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# MONEYFLEXERSKI_PROFILE=1 times the wrapped operations, =cprofile also runs
+# them under cProfile. Results are written to
+# MONEYFLEXERSKI_PROFILE_OUT (.json, plus .prof for cProfile) at exit.
+PROFILE_MODE = os.environ.get('MONEYFLEXERSKI_PROFILE', '').lower()
+PROFILE_OUT = os.environ.get('MONEYFLEXERSKI_PROFILE_OUT', 'moneyflexerski_profile.json')
+
+# Latest samples kept per operation for the percentiles
+SAMPLE_WINDOW = 2000
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def count_controls(control):
+    # Size of a Flet control tree, walked through the same children Flet
+    # serializes when it diffs the page
+    count = 0
+    stack = [control]
+    while stack:
+        current = stack.pop()
+        count += 1
+        get_children = getattr(current, '_get_children', None)
+        if get_children is not None:
+            stack.extend(child for child in get_children() if child is not None)
+    return count
+
+
+class OperationStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+        self.sizes = deque(maxlen=SAMPLE_WINDOW)
+
+    def add(self, seconds, size=None):
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+        if size is not None:
+            self.sizes.append(size)
+
+    def as_dict(self):
+        result = {
+            'count': self.count,
+            'total_ms': round(self.total * 1000, 3),
+            'p50_ms': round(percentile(self.samples, 0.5) * 1000, 3),
+            'p95_ms': round(percentile(self.samples, 0.95) * 1000, 3),
+        }
+        if self.sizes:
+            result['controls_p50'] = percentile(self.sizes, 0.5)
+            result['controls_max'] = max(self.sizes)
+        return result
+
+
+class Instrumentation:
+    # Collects per-operation timings. Disabled instances hand back the
+    # original callables from `wrap`, so leaving the hooks in costs nothing.
+    def __init__(self, enabled=False, profile=False):
+        self.enabled = enabled or profile
+        self.operations = {}
+        self.lock = threading.Lock()
+        # cProfile only sees the thread that enables it and Flet runs
+        # handlers on worker threads, so each outermost wrapped call turns
+        # it on for its own thread, one thread at a time
+        self.profiler = cProfile.Profile() if profile else None
+        self.profile_lock = threading.Lock()
+        self.local = threading.local()
+
+    def record(self, name, seconds, size=None):
+        with self.lock:
+            if name not in self.operations:
+                self.operations[name] = OperationStats()
+            self.operations[name].add(seconds, size)
+
+    def wrap(self, name, fn, size_of=None):
+        # `size_of()` is measured after the call, e.g. the control tree a
+        # page.update() just sent
+        if not self.enabled:
+            return fn
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            depth = getattr(self.local, 'depth', 0)
+            profiling = (
+                self.profiler is not None and depth == 0
+                and self.profile_lock.acquire(blocking=False)
+            )
+            if profiling:
+                self.profiler.enable()
+            self.local.depth = depth + 1
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                self.local.depth = depth
+                if profiling:
+                    self.profiler.disable()
+                    self.profile_lock.release()
+                self.record(name, elapsed, size_of() if size_of else None)
+        return timed
+
+    def instrument(self, obj, method_names, prefix=''):
+        # Replaces the methods on this instance only
+        if not self.enabled:
+            return obj
+        for method_name in method_names:
+            setattr(obj, method_name, self.wrap(prefix + method_name, getattr(obj, method_name)))
+        return obj
+
+    def stats(self):
+        with self.lock:
+            return {name: stats.as_dict() for name, stats in sorted(self.operations.items())}
+
+    def reset(self):
+        with self.lock:
+            self.operations.clear()
+
+    def dump(self, path=None):
+        # Writes the timings as JSON and, when cProfile is running, the
+        # profile next to it (load it with pstats or snakeviz)
+        path = path or PROFILE_OUT
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.stats(), f, indent=2)
+        written = [path]
+        if self.profiler is not None:
+            with self.profile_lock:
+                profile_path = os.path.splitext(path)[0] + '.prof'
+                self.profiler.dump_stats(profile_path)
+            written.append(profile_path)
+        return written
+
+
+_instrumentation = None
+
+
+def get_instrumentation():
+    # One shared collector for the process, configured from the environment
+    global _instrumentation
+    if _instrumentation is None:
+        _instrumentation = Instrumentation(
+            enabled=PROFILE_MODE not in ('', '0', 'false', 'off'),
+            profile=PROFILE_MODE == 'cprofile',
+        )
+        if _instrumentation.enabled:
+            atexit.register(_instrumentation.dump)
+    return _instrumentation
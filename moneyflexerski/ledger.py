@@ -0,0 +1,384 @@
+import heapq
+import os
+import threading
+from bisect import bisect_left, insort
+
+from tinydb.table import Document
+
+from .batching import WriteBatcher, recover
+from .rollup import ROLLUP_VERSION, Rollup, RollupReads, file_stamp, read_rollup, write_rollup
+from .summary import SummaryCache, signed_amount, summarize_month
+
+RECORD_TYPES = ('income', 'expense', 'additional_earning', 'section_entry')
+
+# History orderings: which sorted index they walk and whether backwards
+HISTORY_ORDERS = {
+    'newest_first': ('by_date', True),
+    'oldest_first': ('by_date', False),
+    'highest_amount': ('by_amount', True),
+    'lowest_amount': ('by_amount', False),
+}
+
+
+def _date_key(doc):
+    return (doc.get('year', 0), doc.get('month', 0), doc.get('day', 0), doc.doc_id)
+
+
+def _amount_key(doc):
+    return (doc['amount'], doc.doc_id)
+
+
+def _remove_key(index, key):
+    i = bisect_left(index, key)
+    if i < len(index) and index[i] == key:
+        del index[i]
+
+
+def _discard(bucket, doc):
+    # Documents compare equal by value, so match on identity
+    for i, other in enumerate(bucket):
+        if other is doc:
+            del bucket[i]
+            return
+
+
+class Ledger(RollupReads):
+    # In-memory indexes over the TinyDB ledger. They are built once when the
+    # ledger is opened and kept in sync on every write, so the dashboard,
+    # charts and sections never have to scan the whole table.
+    def __init__(self, db, path=None):
+        self.db = db
+        self.path = path
+        self.records = {}     # doc_id -> Document
+        self.by_month = {}    # (year, month, type) -> [Document]
+        self.by_section = {}  # section name -> [Document]
+        self.summaries = SummaryCache()  # (year, month) -> MonthSummary, dropped when the month changes
+        self.grouped_section_totals = None  # see section_totals, dropped when a section record changes
+        self.section_entry_totals = {}  # section name -> sum of its section_entry amounts
+        self.section_rows = {}  # section name -> row in the sections table
+        self.by_date = None   # sorted (year, month, day, doc_id), built on first use
+        self.by_amount = None  # sorted (amount, doc_id), built on first use
+        self.next_id = 1      # ids are handed out here so batched records have them before they are stored
+        self.rollup = None    # Rollup of every record, saved next to the database (see load_rollup)
+        self.rollup_dirty = False
+        self.lock = threading.RLock()
+        self.batcher = None
+        self.rebuild_index()
+
+    def rebuild_index(self):
+        self.records.clear()
+        self.by_month.clear()
+        self.by_section.clear()
+        self.summaries.clear()
+        self.grouped_section_totals = None
+        self.section_entry_totals = {}
+        # Reports that never page through the history don't pay for sorting
+        self.by_date = None
+        self.by_amount = None
+        self.rollup = None  # Loaded (or rebuilt) once all records are in
+        for doc in self.db.all():
+            self._add_to_index(doc)
+        self.next_id = max(self.records, default=0) + 1
+        self.load_rollup()
+
+    @property
+    def rollup_path(self):
+        return self.path + '.rollup' if self.path else None
+
+    def rollup_stamp(self):
+        # Identifies the records a saved rollup was built from. Changes
+        # that keep every id and amount are not noticed, rebuild_rollup()
+        # covers those.
+        return {
+            'version': ROLLUP_VERSION,
+            'records': len(self.records),
+            'last_id': max(self.records, default=0),
+            'amount_total': round(sum(doc.get('amount', 0) for doc in self.records.values()), 6),
+        }
+
+    def load_rollup(self):
+        # The saved rollup when it matches the records, otherwise rebuilt from them
+        rollup = read_rollup(self.rollup_path, self.rollup_stamp()) if self.path else None
+        if rollup is None:
+            self.rebuild_rollup()
+        else:
+            self.rollup = rollup
+            self.rollup_dirty = False
+
+    def rebuild_rollup(self):
+        rollup = Rollup()
+        for doc in self.records.values():
+            rollup.add(doc)
+        self.rollup = rollup
+        self.rollup_dirty = True
+
+    def save_rollup(self):
+        # Also saved when only the files moved on (section rows, compaction),
+        # so open_rollup can go by the file stamp
+        if not self.path:
+            return
+        files = file_stamp(self.path)
+        if self.rollup_dirty or self.rollup.files != files:
+            write_rollup(self.rollup_path, self.rollup, self.rollup_stamp(), files)
+            self.rollup_dirty = False
+
+    def enable_batching(self, interval=2.0, max_batch=50):
+        # Inserts are indexed (and visible) right away but stored in groups
+        pending_path = self.path + '.pending' if self.path else None
+        leftovers = [(doc_id, record) for doc_id, record in recover(pending_path) if doc_id not in self.records]
+        if leftovers:
+            self._write_batch(leftovers)
+            for doc_id, record in leftovers:
+                self._add_to_index(Document(record, doc_id))
+            self.next_id = max(self.records) + 1
+        if pending_path and os.path.exists(pending_path):
+            os.remove(pending_path)
+        self.batcher = WriteBatcher(self._write_batch, pending_path, interval, max_batch)
+
+    def _write_batch(self, entries):
+        with self.lock:
+            self.db.insert_multiple(Document(record, doc_id) for doc_id, record in entries)
+
+    def flush(self):
+        if self.batcher is not None:
+            self.batcher.flush()
+
+    def close(self):
+        if self.batcher is not None:
+            self.batcher.close()
+        self.db.close()
+        self.save_rollup()
+
+    def sorted_index(self, name):
+        # by_date or by_amount, sorted once in bulk and kept with bisect afterwards
+        if self.by_date is None:
+            self.by_date = sorted(_date_key(doc) for doc in self.records.values())
+            self.by_amount = sorted(_amount_key(doc) for doc in self.records.values())
+        return getattr(self, name)
+
+    def _add_to_index(self, doc):
+        self.records[doc.doc_id] = doc
+        self.summaries.pop((doc.get('year'), doc.get('month')), None)
+        if self.by_date is not None:
+            insort(self.by_date, _date_key(doc))
+            insort(self.by_amount, _amount_key(doc))
+        key = (doc.get('year'), doc.get('month'), doc.get('type'))
+        self.by_month.setdefault(key, []).append(doc)
+        if self.rollup is not None:
+            self.rollup.add(doc)
+            self.rollup_dirty = True
+        section = doc.get('section')
+        if section:
+            self.by_section.setdefault(section, []).append(doc)
+            self.grouped_section_totals = None
+            if doc.get('type') == 'section_entry':
+                self.section_entry_totals[section] = self.section_entry_totals.get(section, 0) + doc['amount']
+
+    def _remove_from_index(self, doc):
+        self.records.pop(doc.doc_id, None)
+        self.summaries.pop((doc.get('year'), doc.get('month')), None)
+        if self.by_date is not None:
+            _remove_key(self.by_date, _date_key(doc))
+            _remove_key(self.by_amount, _amount_key(doc))
+        key = (doc.get('year'), doc.get('month'), doc.get('type'))
+        _discard(self.by_month.get(key, []), doc)
+        if self.rollup is not None:
+            self.rollup.remove(doc)
+            self.rollup_dirty = True
+        section = doc.get('section')
+        if section:
+            _discard(self.by_section.get(section, []), doc)
+            self.grouped_section_totals = None
+            if doc.get('type') == 'section_entry':
+                self.section_entry_totals[section] -= doc['amount']
+
+    def insert(self, record):
+        with self.lock:
+            doc = Document(dict(record), self.next_id)
+            self.next_id += 1
+            if self.batcher is None:
+                self.db.insert(doc)
+            self._add_to_index(doc)
+        # Queued outside self.lock: a flush holds the batcher's lock and then
+        # takes self.lock in _write_batch, so the two are never taken the other way round
+        if self.batcher is not None:
+            self.batcher.add(doc.doc_id, dict(doc))
+        return doc.doc_id
+
+    def insert_multiple(self, records):
+        # One bulk write for any number of records. They are indexed as the
+        # iterable is consumed, so it can be a generator over a huge file.
+        self.flush()
+        with self.lock:
+            # Sorted orderings are rebuilt in bulk on next use rather than per record
+            self.by_date = None
+            self.by_amount = None
+
+            def documents():
+                for record in records:
+                    doc = Document(dict(record), self.next_id)
+                    self.next_id += 1
+                    self._add_to_index(doc)
+                    yield doc
+            try:
+                doc_ids = self.db.insert_multiple(documents())
+            except Exception:
+                # Nothing was stored, drop whatever got indexed
+                self.rebuild_index()
+                raise
+        return doc_ids
+
+    def upsert(self, record):
+        # Upserted records (monthly income) are unique per (year, month, type)
+        existing = self.get(record['type'], record['year'], record['month'])
+        if existing is None:
+            return self.insert(record)
+        # The record may still be waiting in the batch
+        self.flush()
+        with self.lock:
+            self.db.update(dict(record), doc_ids=[existing.doc_id])
+            self._remove_from_index(existing)
+            existing.update(record)
+            self._add_to_index(existing)
+        return existing.doc_id
+
+    def get(self, record_type, year, month):
+        bucket = self.by_month.get((year, month, record_type))
+        return bucket[0] if bucket else None
+
+    def search(self, record_type, year, month, section=None):
+        bucket = self.by_month.get((year, month, record_type), [])
+        if section is None:
+            return list(bucket)
+        return [doc for doc in bucket if doc.get('section') == section]
+
+    def month_records(self, year, month):
+        for record_type in RECORD_TYPES:
+            yield from self.by_month.get((year, month, record_type), [])
+
+    def month_summary(self, year, month):
+        return self.month_summaries([(year, month)])[0]
+
+    def month_summaries(self, months):
+        # Summaries for several months, in order. Records are already bucketed
+        # by month, so each missing one is a summarize_month over its bucket;
+        # the Documents have no columns for summarize_columns to work on.
+        found = {month: self.summaries.get(month) for month in months}
+        for month, summary in found.items():
+            if summary is None:
+                self.summaries[month] = found[month] = summarize_month(self.month_records(*month), *month)
+        return [found[month] for month in months]
+
+    def section_records(self, name):
+        return list(self.by_section.get(name, []))
+
+    def top_records(self, n, record_type='expense', year=None, month=None):
+        # Largest amounts first. A single month only looks at its own
+        # bucket; otherwise the amount index is walked from the top.
+        if year is not None and month is not None:
+            return heapq.nlargest(n, self.by_month.get((year, month, record_type), []), key=lambda doc: doc['amount'])
+        found = []
+        for key in reversed(self.sorted_index('by_amount')):
+            doc = self.records[key[-1]]
+            if doc.get('type') == record_type and year in (None, doc.get('year')) and month in (None, doc.get('month')):
+                found.append(doc)
+                if len(found) == n:
+                    break
+        return found
+
+    def section_totals(self):
+        # {section: {(year, month): total}} for every section and month, in
+        # one pass over the section index (records without a section are never visited)
+        if self.grouped_section_totals is None:
+            totals = {}
+            for name, docs in self.by_section.items():
+                months = totals.setdefault(name, {})
+                for doc in docs:
+                    month = (doc.get('year'), doc.get('month'))
+                    months[month] = months.get(month, 0) + signed_amount(doc)
+            self.grouped_section_totals = totals
+        return self.grouped_section_totals
+
+    def history(self, order, offset=0, limit=None):
+        # One window of the history, read straight off a sorted index.
+        # Descending orders walk the same index from the end.
+        index_name, reverse = HISTORY_ORDERS[order]
+        index = self.sorted_index(index_name)
+        size = len(index)
+        stop = size if limit is None else min(offset + limit, size)
+        if reverse:
+            keys = index[size - stop:size - offset][::-1] if offset < size else []
+        else:
+            keys = index[offset:stop]
+        return [self.records[key[-1]] for key in keys]
+
+    def iter_records(self, year=None, month=None, record_type=None, section=None):
+        # Records in date order, narrowed through whichever index fits the filters
+        if section is not None:
+            candidates = sorted(self.by_section.get(section, []), key=_date_key)
+        elif year is not None and month is not None and record_type is not None:
+            candidates = sorted(self.by_month.get((year, month, record_type), []), key=_date_key)
+        elif year is not None and month is not None:
+            candidates = sorted(self.month_records(year, month), key=_date_key)
+        else:
+            candidates = (self.records[key[-1]] for key in self.sorted_index('by_date'))
+        for doc in candidates:
+            if year is not None and doc.get('year') != year:
+                continue
+            if month is not None and doc.get('month') != month:
+                continue
+            if record_type is not None and doc.get('type') != record_type:
+                continue
+            yield doc
+
+    def load_sections(self):
+        # Section balances are a view over the section_entry records: the
+        # opening balance plus every entry. Rows that drifted from the
+        # entries are corrected as they are loaded.
+        with self.lock:
+            table = self.db.table('sections')
+            self.section_rows = {}
+            for row in table.all():
+                entries = self.section_entry_totals.get(row['name'], 0)
+                if 'opening_balance' not in row:
+                    # Older rows only kept the running balance, which already includes the entries
+                    row['opening_balance'] = row.get('balance', 0) - entries
+                    table.update({'opening_balance': row['opening_balance']}, doc_ids=[row.doc_id])
+                balance = row['opening_balance'] + entries
+                if row.get('balance') != balance:
+                    row['balance'] = balance
+                    table.update({'balance': balance}, doc_ids=[row.doc_id])
+                self.section_rows[row['name']] = row
+        return [{'name': row['name'], 'balance': row['balance']} for row in self.section_rows.values()]
+
+    def rebuild_section_balances(self):
+        # Recounts the entries from the records themselves, then reloads.
+        # Queued records are written first: rebuild_index rereads the table.
+        self.flush()
+        self.rebuild_index()
+        return self.load_sections()
+
+    def add_section(self, name, opening_balance=0):
+        with self.lock:
+            table = self.db.table('sections')
+            row = {'name': name, 'opening_balance': opening_balance, 'balance': opening_balance + self.section_entry_totals.get(name, 0)}
+            doc_id = table.insert(row)
+            self.section_rows[name] = Document(row, doc_id)
+        return row['balance']
+
+    def add_section_entry(self, name, amount, year, month, day):
+        # Stores the entry, then moves the section's balance by just that amount
+        if name not in self.section_rows:
+            raise ValueError(f"Unknown section {name!r}")
+        self.insert({'type': 'section_entry', 'section': name, 'amount': amount, 'day': day, 'year': year, 'month': month})
+        with self.lock:
+            row = self.section_rows[name]
+            row['balance'] = row['opening_balance'] + self.section_entry_totals[name]
+            self.db.table('sections').update({'balance': row['balance']}, doc_ids=[row.doc_id])
+        return row['balance']
+
+    def all(self):
+        return list(self.records.values())
+
+    def __len__(self):
+        return len(self.records)
@@ -0,0 +1,195 @@
+import json
+import os
+
+from .series import build_cumulative, iter_months
+from .summary import get_days_in_month
+
+# Bumped whenever the rollup layout changes, older files are rebuilt
+ROLLUP_VERSION = 1
+
+
+def _month_index(year, month):
+    return year * 12 + month
+
+
+def _signed(record_type, total):
+    return -total if record_type == 'expense' else total
+
+
+class Rollup:
+    # Totals and counts per (year, month, day, type, section), kept in step
+    # with the records so yearly views and long ranges never go back to the
+    # raw rows. Income is monthly and sits on day 0, a missing day counts
+    # as day 1 and records without a section use ''. Days past the end of
+    # the month are clamped by the readers, as summarize_month does.
+    def __init__(self):
+        self.days = {}    # (year, month, day, type, section) -> [total, count]
+        self.months = {}  # (year, month, type, section) -> [total, count]
+        self.files = None  # file_stamp of the database it was last saved against
+
+    def add(self, record, sign=1):
+        record_type = record.get('type')
+        year, month = record.get('year'), record.get('month')
+        day = 0 if record_type == 'income' else max(record.get('day') or 1, 1)
+        section = record.get('section') or ''
+        amount = record.get('amount', 0) * sign
+        for table, key in (
+            (self.days, (year, month, day, record_type, section)),
+            (self.months, (year, month, record_type, section)),
+        ):
+            cell = table.get(key)
+            if cell is None:
+                cell = table[key] = [0, 0]
+            cell[0] += amount
+            cell[1] += sign
+            if cell[1] == 0:
+                del table[key]
+
+    def remove(self, record):
+        self.add(record, -1)
+
+    def rows(self):
+        return [list(key) + cell for key, cell in self.days.items()]
+
+    @classmethod
+    def from_rows(cls, rows):
+        rollup = cls()
+        for year, month, day, record_type, section, total, count in rows:
+            rollup.days[(year, month, day, record_type, section)] = [total, count]
+            cell = rollup.months.setdefault((year, month, record_type, section), [0, 0])
+            cell[0] += total
+            cell[1] += count
+        return rollup
+
+    def monthly_totals(self, start, end):
+        # {(year, month): {type: total}} for the inclusive range
+        low, high = _month_index(*start), _month_index(*end)
+        totals = {}
+        for (year, month, record_type, _), (total, _) in self.months.items():
+            if low <= _month_index(year, month) <= high:
+                types = totals.setdefault((year, month), {})
+                types[record_type] = types.get(record_type, 0) + total
+        return totals
+
+    def daily_totals(self, start, end):
+        # {(year, month, day): {type: total}}, income left out (it is monthly)
+        low, high = _month_index(*start), _month_index(*end)
+        totals = {}
+        for (year, month, day, record_type, _), (total, _) in self.days.items():
+            if record_type != 'income' and low <= _month_index(year, month) <= high:
+                types = totals.setdefault((year, month, day), {})
+                types[record_type] = types.get(record_type, 0) + total
+        return totals
+
+    def section_totals(self, start, end):
+        # {section: earnings minus expenses} over the range
+        low, high = _month_index(*start), _month_index(*end)
+        totals = {}
+        for (year, month, record_type, section), (total, _) in self.months.items():
+            if section and record_type != 'income' and low <= _month_index(year, month) <= high:
+                totals[section] = totals.get(section, 0) + _signed(record_type, total)
+        return totals
+
+    def span(self):
+        # First and last (year, month) with any data, None when empty
+        months = [(year, month) for year, month, _, _ in self.months]
+        return (min(months), max(months)) if months else None
+
+
+def yearly_totals(monthly):
+    # Folds monthly_totals output into {year: {type: total}}
+    totals = {}
+    for (year, _), types in monthly.items():
+        year_types = totals.setdefault(year, {})
+        for record_type, total in types.items():
+            year_types[record_type] = year_types.get(record_type, 0) + total
+    return totals
+
+
+def rollup_series(monthly, daily, start, end):
+    # The same CumulativeSeries cumulative_series builds from month
+    # summaries, read from rollup totals instead of records
+    per_day = {}
+    for (year, month, day), types in daily.items():
+        per_day.setdefault((year, month), []).append((day, types))
+
+    days, daily_income, daily_expenses, daily_earnings = [], [], [], []
+    for year, month in iter_months(start, end):
+        days_in_month = get_days_in_month(year, month)
+        income = monthly.get((year, month), {}).get('income', 0)
+        expenses = [0] * days_in_month
+        earnings = [0] * days_in_month
+        for day, types in per_day.get((year, month), []):
+            day = min(max(day, 1), days_in_month)
+            expenses[day - 1] += types.get('expense', 0)
+            earnings[day - 1] += types.get('additional_earning', 0)
+        days.append((year, month, days_in_month))
+        daily_income.extend([income / days_in_month if income else 0] * days_in_month)
+        daily_expenses.extend(expenses)
+        daily_earnings.extend(earnings)
+    return build_cumulative(days, daily_income, daily_expenses, daily_earnings)
+
+
+class RollupReads:
+    # The rollup reads Ledger and RollupReader share, answered from self.rollup
+    def monthly_totals(self, start, end):
+        # {(year, month): {type: total}}, both ends inclusive
+        return self.rollup.monthly_totals(start, end)
+
+    def daily_totals(self, start, end):
+        return self.rollup.daily_totals(start, end)
+
+    def yearly_totals(self, start_year, end_year):
+        return yearly_totals(self.rollup.monthly_totals((start_year, 1), (end_year, 12)))
+
+    def section_rollup(self, start, end):
+        return self.rollup.section_totals(start, end)
+
+    def rollup_span(self):
+        return self.rollup.span()
+
+    def rollup_series(self, start, end):
+        # The range chart's series, no records or month summaries involved
+        return rollup_series(self.monthly_totals(start, end), self.daily_totals(start, end), start, end)
+
+
+class RollupReader(RollupReads):
+    # Read-only stand-in for a ledger built from the rollup sidecar alone,
+    # for reports that only need totals (see storage.open_rollup)
+    def __init__(self, rollup):
+        self.rollup = rollup
+
+    def close(self):
+        pass
+
+
+def file_stamp(path):
+    # Size and mtime of the database files, so a sidecar can be trusted
+    # without loading the records its stamp is computed from
+    paths = (path, path + '.journal', path + '.pending')
+    return [[p, os.path.getsize(p), os.stat(p).st_mtime_ns] for p in paths if os.path.exists(p)]
+
+
+def read_rollup(path, stamp=None, files=None):
+    # The saved rollup if it was written for exactly these records (or
+    # these database files), else None
+    try:
+        with open(path, encoding='utf-8') as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if stamp is not None and saved.get('stamp') != stamp:
+        return None
+    if files is not None and saved.get('files') != files:
+        return None
+    rollup = Rollup.from_rows(saved['rows'])
+    rollup.files = saved.get('files')
+    return rollup
+
+
+def write_rollup(path, rollup, stamp, files=None):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'stamp': stamp, 'files': files, 'rows': rollup.rows()}, f)
+    os.replace(tmp_path, path)
+    rollup.files = files
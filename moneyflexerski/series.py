@@ -0,0 +1,129 @@
+from datetime import date
+from itertools import accumulate
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, itertools covers everything it does here
+    np = None
+
+
+def prefix_sums(values):
+    if np is not None and len(values) > 256:
+        return np.cumsum(np.asarray(values, dtype=float)).tolist()
+    return list(accumulate(values))
+
+
+def iter_months(start, end):
+    # Inclusive range of (year, month) pairs
+    year, month = start
+    while (year, month) <= tuple(end):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+class CumulativeSeries:
+    # Running totals for every day of a range, one list per chart line
+    def __init__(self, days, income, expenses, earnings, balances):
+        self.days = days  # datetime.date for each point
+        self.income = income
+        self.expenses = expenses
+        self.earnings = earnings
+        self.balances = balances
+
+    def __len__(self):
+        return len(self.days)
+
+
+def cumulative_series(summaries):
+    # Chains MonthSummary objects (in chronological order) into one series.
+    # The balance is the income shares plus everything earned minus spent
+    # since the range start, so each month carries the ones before it. The
+    # month charts show MonthSummary.balances instead.
+    months = []
+    daily_income = []
+    daily_expenses = []
+    daily_earnings = []
+    for summary in summaries:
+        months.append((summary.year, summary.month, summary.days_in_month))
+        daily_income.extend([summary.daily_income] * summary.days_in_month)
+        daily_expenses.extend(summary.daily_expenses)
+        daily_earnings.extend(summary.daily_additional_earnings)
+    return build_cumulative(months, daily_income, daily_expenses, daily_earnings)
+
+
+def build_cumulative(months, daily_income, daily_expenses, daily_earnings):
+    # months is [(year, month, days_in_month)], the daily lists cover them back to back
+    days = [date(year, month, day) for year, month, days_in_month in months for day in range(1, days_in_month + 1)]
+    income = prefix_sums(daily_income)
+    expenses = prefix_sums(daily_expenses)
+    earnings = prefix_sums(daily_earnings)
+    if np is not None and len(days) > 256:
+        balances = (np.asarray(income) + np.asarray(earnings) - np.asarray(expenses)).tolist()
+    else:
+        balances = [received + earned - spent for received, earned, spent in zip(income, earnings, expenses)]
+    return CumulativeSeries(days, income, expenses, earnings, balances)
+
+
+def shift_month(year, month, months):
+    # (year, month) moved by `months`, negative goes back
+    index = year * 12 + month - 1 + months
+    return index // 12, index % 12 + 1
+
+
+def lttb(ys, threshold, xs=None):
+    # Largest-Triangle-Three-Buckets: indices of `threshold` points that keep
+    # the visible shape of the line. The first and last points always stay;
+    # from every bucket in between it keeps the point forming the largest
+    # triangle with the previous pick and the next bucket's average.
+    n = len(ys)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    if xs is None:
+        xs = range(n)
+
+    picked = [0]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, n)
+        next_count = next_end - end
+        avg_x = sum(xs[i] for i in range(end, next_end)) / next_count
+        avg_y = sum(ys[i] for i in range(end, next_end)) / next_count
+
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for i in range(start, end):
+            area = abs((ax - avg_x) * (ys[i] - ay) - (ax - xs[i]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = i, area
+        picked.append(best)
+        a = best
+    picked.append(n - 1)
+    return picked
+
+
+def minmax_buckets(ys, threshold):
+    # Indices of the lowest and highest point of each bucket, in order, so
+    # spikes survive where LTTB might smooth them out
+    n = len(ys)
+    if threshold >= n or threshold < 4:
+        return list(range(n))
+    buckets = threshold // 2
+    picked = []
+    for bucket in range(buckets):
+        start = bucket * n // buckets
+        end = (bucket + 1) * n // buckets
+        low = min(range(start, end), key=ys.__getitem__)
+        high = max(range(start, end), key=ys.__getitem__)
+        picked.extend(sorted({low, high}))
+    return picked
+
+
+DOWNSAMPLERS = {'lttb': lttb, 'minmax': minmax_buckets}
+
+
+def downsample(ys, threshold, method='lttb'):
+    # [(index, value)] with at most `threshold` points
+    return [(i, ys[i]) for i in DOWNSAMPLERS[method](ys, threshold)]
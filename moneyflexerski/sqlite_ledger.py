@@ -0,0 +1,445 @@
+import heapq
+import sqlite3
+import threading
+from contextlib import closing
+from itertools import islice
+
+from .rollup import rollup_series, yearly_totals
+from .summary import SummaryCache, summarize_columns
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    amount REAL NOT NULL,
+    day INTEGER,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    section TEXT
+);
+CREATE INDEX IF NOT EXISTS transactions_period ON transactions (year, month, type);
+CREATE INDEX IF NOT EXISTS transactions_section ON transactions (section);
+CREATE INDEX IF NOT EXISTS transactions_date ON transactions (year, month, day);
+CREATE INDEX IF NOT EXISTS transactions_amount ON transactions (amount);
+CREATE TABLE IF NOT EXISTS monthly_income (
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    amount REAL NOT NULL,
+    PRIMARY KEY (year, month)
+);
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    balance REAL NOT NULL DEFAULT 0,
+    opening_balance REAL
+);
+CREATE TABLE IF NOT EXISTS rollups (
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    section TEXT NOT NULL,
+    total REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (year, month, day, type, section)
+);
+CREATE TRIGGER IF NOT EXISTS rollup_insert AFTER INSERT ON transactions BEGIN
+    INSERT INTO rollups VALUES (
+        NEW.year, NEW.month, MAX(COALESCE(NEW.day, 1), 1), NEW.type, COALESCE(NEW.section, ''), NEW.amount, 1
+    ) ON CONFLICT DO UPDATE SET total = total + excluded.total, count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS rollup_delete AFTER DELETE ON transactions BEGIN
+    UPDATE rollups SET total = total - OLD.amount, count = count - 1
+    WHERE year = OLD.year AND month = OLD.month AND day = MAX(COALESCE(OLD.day, 1), 1)
+        AND type = OLD.type AND section = COALESCE(OLD.section, '');
+END;
+CREATE TRIGGER IF NOT EXISTS rollup_update AFTER UPDATE ON transactions BEGIN
+    UPDATE rollups SET total = total - OLD.amount, count = count - 1
+    WHERE year = OLD.year AND month = OLD.month AND day = MAX(COALESCE(OLD.day, 1), 1)
+        AND type = OLD.type AND section = COALESCE(OLD.section, '');
+    INSERT INTO rollups VALUES (
+        NEW.year, NEW.month, MAX(COALESCE(NEW.day, 1), 1), NEW.type, COALESCE(NEW.section, ''), NEW.amount, 1
+    ) ON CONFLICT DO UPDATE SET total = total + excluded.total, count = count + 1;
+END;
+"""
+
+# Rebuilds the rollups in the same shape the triggers keep them
+ROLLUP_REBUILD = (
+    "INSERT INTO rollups SELECT year, month, MAX(COALESCE(day, 1), 1), type, COALESCE(section, ''), "
+    "SUM(amount), COUNT(*) FROM transactions GROUP BY 1, 2, 3, 4, 5"
+)
+# Rollup rows whose month falls in an inclusive (year * 12 + month) range
+ROLLUP_RANGE = "year * 12 + month BETWEEN ? AND ?"
+
+TRANSACTION_COLUMNS = ('type', 'amount', 'day', 'year', 'month', 'section')
+
+# Correlated subquery for the entries of the section row being updated
+SECTION_ENTRIES_SUM = (
+    "SELECT COALESCE(SUM(amount), 0) FROM transactions "
+    "WHERE type = 'section_entry' AND transactions.section = sections.name"
+)
+
+# One income row per (year, month), a later one replaces it
+INCOME_UPSERT = "INSERT OR REPLACE INTO monthly_income (year, month, amount) VALUES (?, ?, ?)"
+
+
+def _date_key(record):
+    return (record['year'], record['month'], record.get('day') or 0)
+
+
+def _amount_key(record):
+    return record['amount']
+
+
+# History orderings: ORDER BY for transactions, ORDER BY for monthly_income,
+# the key both are merged on and whether it runs descending
+HISTORY_ORDERS = {
+    'newest_first': ('year DESC, month DESC, day DESC, id DESC', 'year DESC, month DESC', _date_key, True),
+    'oldest_first': ('year, month, day, id', 'year, month', _date_key, False),
+    'highest_amount': ('amount DESC, id DESC', 'amount DESC', _amount_key, True),
+    'lowest_amount': ('amount, id', 'amount', _amount_key, False),
+}
+
+
+def _transaction(row):
+    # Same shape save_expense_or_earning and add_to_section write to TinyDB
+    record = {'type': row[0], 'amount': row[1], 'day': row[2], 'year': row[3], 'month': row[4]}
+    if row[5] is not None:
+        record['section'] = row[5]
+    return record
+
+
+def _income(row):
+    return {'type': 'income', 'amount': row[2], 'year': row[0], 'month': row[1]}
+
+
+class SqliteLedger:
+    # Ledger backed by a local SQLite file. Every lookup is an indexed query
+    # and monthly aggregates run as GROUP BY in the database, so nothing is
+    # held in memory apart from the memoized month summaries.
+    def __init__(self, path='expense_db.sqlite3'):
+        self.path = path
+        self.lock = threading.RLock()  # Flet runs handlers on worker threads
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(sections)")]
+        if 'opening_balance' not in columns:
+            self.conn.execute("ALTER TABLE sections ADD COLUMN opening_balance REAL")
+        self.summaries = SummaryCache()
+        # The triggers keep the rollups current; databases written before
+        # they existed (or edited around them) are caught by the row count
+        stale = self.conn.execute(
+            "SELECT (SELECT COUNT(*) FROM transactions) != (SELECT COALESCE(SUM(count), 0) FROM rollups)"
+        ).fetchone()[0]
+        if stale:
+            self.rebuild_rollup()
+
+    def rebuild_rollup(self):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM rollups")
+            self.conn.execute(ROLLUP_REBUILD)
+
+    def flush(self):
+        pass  # every insert is committed on its own
+
+    def close(self):
+        self.conn.close()
+
+    def insert(self, record):
+        if record['type'] == 'income':
+            return self.upsert(record)
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO transactions (type, amount, day, year, month, section) VALUES (?, ?, ?, ?, ?, ?)",
+                [record.get(column) for column in TRANSACTION_COLUMNS],
+            )
+        self.summaries.pop((record['year'], record['month']), None)
+        return cursor.lastrowid
+
+    def insert_multiple(self, records):
+        # Streams records into one transaction, income rows included, so a
+        # failure part way leaves nothing behind
+        income = []
+        months = set()
+
+        def rows():
+            for record in records:
+                if record['type'] == 'income':
+                    income.append(record)
+                    continue
+                months.add((record['year'], record['month']))
+                yield [record.get(column) for column in TRANSACTION_COLUMNS]
+
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO transactions (type, amount, day, year, month, section) VALUES (?, ?, ?, ?, ?, ?)", rows()
+            )
+            self.conn.executemany(INCOME_UPSERT, [(record['year'], record['month'], record['amount']) for record in income])
+        months.update((record['year'], record['month']) for record in income)
+        for month in months:
+            self.summaries.pop(month, None)
+
+    def upsert(self, record):
+        # Only monthly income is upserted, one row per (year, month)
+        with self.lock, self.conn:
+            self.conn.execute(INCOME_UPSERT, (record['year'], record['month'], record['amount']))
+        self.summaries.pop((record['year'], record['month']), None)
+
+    def get(self, record_type, year, month):
+        records = self.search(record_type, year, month)
+        return records[0] if records else None
+
+    def search(self, record_type, year, month, section=None):
+        with self.lock:
+            if record_type == 'income':
+                rows = self.conn.execute(
+                    "SELECT year, month, amount FROM monthly_income WHERE year = ? AND month = ?", (year, month)
+                ).fetchall()
+                return [_income(row) for row in rows]
+            query = "SELECT type, amount, day, year, month, section FROM transactions WHERE year = ? AND month = ? AND type = ?"
+            params = [year, month, record_type]
+            if section is not None:
+                query += " AND section = ?"
+                params.append(section)
+            return [_transaction(row) for row in self.conn.execute(query + " ORDER BY id", params)]
+
+    def month_summary(self, year, month):
+        return self.month_summaries([(year, month)])[0]
+
+    def month_summaries(self, months):
+        # Summaries for several months, in order. The missing ones come from
+        # one grouped query whose rows go to summarize_columns as columns,
+        # tagged with the month's slot by the query itself.
+        found = {month: self.summaries.get(month) for month in months}
+        missing = [month for month, summary in found.items() if summary is None]
+        if missing:
+            # Joined through a list of the months, so each one is an index search
+            wanted = f"WITH wanted (slot, year, month) AS (VALUES {', '.join(['(?, ?, ?)'] * len(missing))}) "
+            params = [part for slot, month in enumerate(missing) for part in (slot, *month)]
+            with self.lock:
+                # Income first: one row per month, the first income summarize_month would see
+                rows = self.conn.execute(
+                    wanted + "SELECT wanted.slot, 'income', i.amount, 1, '' FROM wanted "
+                    "JOIN monthly_income i ON i.year = wanted.year AND i.month = wanted.month",
+                    params,
+                ).fetchall()
+                # One grouped row per (month, type, day, section) is all the summaries need
+                rows += self.conn.execute(
+                    wanted + "SELECT wanted.slot, t.type, SUM(t.amount), COALESCE(t.day, 1), COALESCE(t.section, '') FROM wanted "
+                    "CROSS JOIN transactions t ON t.year = wanted.year AND t.month = wanted.month "
+                    "GROUP BY wanted.slot, t.type, t.day, t.section",
+                    params,
+                ).fetchall()
+            slots, type_names, amounts, days, section_names = zip(*rows) if rows else ((),) * 5
+            type_codes, section_codes = {}, {'': 0}
+            types = [type_codes.setdefault(name, len(type_codes)) for name in type_names]
+            sections = [section_codes.setdefault(name, len(section_codes)) for name in section_names]
+            summaries = summarize_columns(missing, slots, days, types, amounts, sections, list(type_codes), list(section_codes))
+            for month, summary in zip(missing, summaries):
+                self.summaries[month] = found[month] = summary
+        return [found[month] for month in months]
+
+    def monthly_totals(self, start, end):
+        # Rollup reads: {(year, month): {type: total}}, both ends inclusive
+        bounds = (start[0] * 12 + start[1], end[0] * 12 + end[1])
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT year, month, type, SUM(total) FROM rollups WHERE {ROLLUP_RANGE} AND count > 0 "
+                "GROUP BY year, month, type", bounds,
+            ).fetchall()
+            rows += self.conn.execute(
+                f"SELECT year, month, 'income', amount FROM monthly_income WHERE {ROLLUP_RANGE}", bounds
+            ).fetchall()
+        totals = {}
+        for year, month, record_type, total in rows:
+            totals.setdefault((year, month), {})[record_type] = total
+        return totals
+
+    def daily_totals(self, start, end):
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT year, month, day, type, SUM(total) FROM rollups WHERE {ROLLUP_RANGE} AND count > 0 "
+                "GROUP BY year, month, day, type",
+                (start[0] * 12 + start[1], end[0] * 12 + end[1]),
+            ).fetchall()
+        totals = {}
+        for year, month, day, record_type, total in rows:
+            totals.setdefault((year, month, day), {})[record_type] = total
+        return totals
+
+    def yearly_totals(self, start_year, end_year):
+        return yearly_totals(self.monthly_totals((start_year, 1), (end_year, 12)))
+
+    def section_rollup(self, start, end):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT section, SUM(CASE WHEN type = 'expense' THEN -total ELSE total END) FROM rollups "
+                f"WHERE {ROLLUP_RANGE} AND section != '' AND count > 0 GROUP BY section",
+                (start[0] * 12 + start[1], end[0] * 12 + end[1]),
+            ).fetchall()
+        return dict(rows)
+
+    def rollup_span(self):
+        with self.lock:
+            low, high = self.conn.execute(
+                "SELECT MIN(year * 12 + month - 1), MAX(year * 12 + month - 1) FROM "
+                "(SELECT year, month FROM rollups WHERE count > 0 UNION ALL SELECT year, month FROM monthly_income)"
+            ).fetchone()
+        if low is None:
+            return None
+        return (low // 12, low % 12 + 1), (high // 12, high % 12 + 1)
+
+    def rollup_series(self, start, end):
+        return rollup_series(self.monthly_totals(start, end), self.daily_totals(start, end), start, end)
+
+    def section_records(self, name):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT type, amount, day, year, month, section FROM transactions WHERE section = ? ORDER BY id", (name,)
+            ).fetchall()
+        return [_transaction(row) for row in rows]
+
+    def top_records(self, n, record_type='expense', year=None, month=None):
+        query = "SELECT type, amount, day, year, month, section FROM transactions WHERE type = ?"
+        params = [record_type]
+        for column, value in (('year', year), ('month', month)):
+            if value is not None:
+                query += f" AND {column} = ?"
+                params.append(value)
+        with self.lock:
+            rows = self.conn.execute(query + " ORDER BY amount DESC LIMIT ?", params + [n]).fetchall()
+        return [_transaction(row) for row in rows]
+
+    def section_totals(self):
+        # {section: {(year, month): total}} from one grouped query
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT section, year, month, SUM(CASE WHEN type = 'expense' THEN -amount ELSE amount END) "
+                "FROM transactions WHERE section IS NOT NULL AND section != '' GROUP BY section, year, month"
+            ).fetchall()
+        totals = {}
+        for section, year, month, total in rows:
+            totals.setdefault(section, {})[(year, month)] = total
+        return totals
+
+    def history(self, order, offset=0, limit=None):
+        # Both tables are read in index order and merged, so a page costs
+        # offset + limit rows no matter how big the ledger is
+        order_by, income_order_by, key, reverse = HISTORY_ORDERS[order]
+        with self.lock:
+            sql_limit = -1 if limit is None else offset + limit
+            transactions = self.conn.execute(
+                f"SELECT type, amount, day, year, month, section FROM transactions ORDER BY {order_by} LIMIT ?",
+                (sql_limit,),
+            ).fetchall()
+            income = self.conn.execute(
+                f"SELECT year, month, amount FROM monthly_income ORDER BY {income_order_by} LIMIT ?",
+                (sql_limit,),
+            ).fetchall()
+        merged = heapq.merge(
+            (_transaction(row) for row in transactions),
+            (_income(row) for row in income),
+            key=key,
+            reverse=reverse,
+        )
+        return list(islice(merged, offset, None if limit is None else offset + limit))
+
+    def iter_records(self, year=None, month=None, record_type=None, section=None):
+        # Streams matching rows off a cursor, income first, then transactions in date order
+        where, params = [], []
+        for column, value in (('year', year), ('month', month)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if section is None and record_type in (None, 'income'):
+            clause = f" WHERE {' AND '.join(where)}" if where else ""
+            with self.lock:
+                income = self.conn.execute(
+                    f"SELECT year, month, amount FROM monthly_income{clause} ORDER BY year, month", params
+                ).fetchall()
+            for row in income:
+                yield _income(row)
+        if record_type == 'income':
+            return
+        for column, value in (('type', record_type), ('section', section)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+        # A separate connection so a long export doesn't hold the lock; it is
+        # closed even when the caller stops reading part way
+        with closing(sqlite3.connect(self.path)) as conn:
+            cursor = conn.execute(
+                f"SELECT type, amount, day, year, month, section FROM transactions{clause} ORDER BY year, month, day, id", params
+            )
+            for row in cursor:
+                yield _transaction(row)
+
+    def all(self):
+        return self.history('oldest_first')
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT (SELECT COUNT(*) FROM transactions) + (SELECT COUNT(*) FROM monthly_income)"
+            ).fetchone()[0]
+
+    def load_sections(self):
+        # Balances are the opening balance plus the section's entries. Rows
+        # that drifted from the entries are corrected as they are loaded.
+        with self.lock, self.conn:
+            # Older rows only kept the running balance, which already includes the entries
+            self.conn.execute(
+                "UPDATE sections SET opening_balance = balance - (" + SECTION_ENTRIES_SUM + ") WHERE opening_balance IS NULL"
+            )
+            self.conn.execute(
+                "UPDATE sections SET balance = opening_balance + (" + SECTION_ENTRIES_SUM + ") "
+                "WHERE balance IS NOT opening_balance + (" + SECTION_ENTRIES_SUM + ")"
+            )
+            rows = self.conn.execute("SELECT name, balance FROM sections ORDER BY id").fetchall()
+        return [{'name': name, 'balance': balance} for name, balance in rows]
+
+    def rebuild_section_balances(self):
+        # The entries are summed straight from the table, so loading recounts them
+        return self.load_sections()
+
+    def add_section(self, name, opening_balance=0):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO sections (name, balance, opening_balance) VALUES (?, ?, ?)",
+                (name, opening_balance, opening_balance),
+            )
+            self.conn.execute("UPDATE sections SET balance = opening_balance + (" + SECTION_ENTRIES_SUM + ") WHERE name = ?", (name,))
+            return self.conn.execute("SELECT balance FROM sections WHERE name = ?", (name,)).fetchone()[0]
+
+    def add_section_entry(self, name, amount, year, month, day):
+        # The entry and the balance move in one transaction
+        with self.lock, self.conn:
+            if self.conn.execute("SELECT 1 FROM sections WHERE name = ?", (name,)).fetchone() is None:
+                raise ValueError(f"Unknown section {name!r}")
+            self.conn.execute(
+                "INSERT INTO transactions (type, amount, day, year, month, section) VALUES ('section_entry', ?, ?, ?, ?, ?)",
+                (amount, day, year, month, name),
+            )
+            self.conn.execute("UPDATE sections SET balance = balance + ? WHERE name = ?", (amount, name))
+            balance = self.conn.execute("SELECT balance FROM sections WHERE name = ?", (name,)).fetchone()[0]
+        self.summaries.pop((year, month), None)
+        return balance
+
+    def save_sections(self, sections):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM sections")
+            self.conn.executemany(
+                "INSERT INTO sections (name, balance, opening_balance) VALUES (?, ?, ?)",
+                ((section['name'], section['balance'], section.get('opening_balance')) for section in sections),
+            )
+
+
+def migrate_from_tinydb(db, ledger):
+    # One-shot copy of a TinyDB ledger (any storage) into an empty SqliteLedger
+    if len(ledger):
+        raise ValueError(f"{ledger.path} already has data, refusing to migrate into it")
+    records = db.all()
+    ledger.insert_multiple(records)
+    ledger.save_sections(db.table('sections').all())
+    return len(records)
@@ -0,0 +1,315 @@
+import json
+import os
+from collections.abc import MutableMapping
+
+from tinydb import TinyDB
+from tinydb.storages import JSONStorage, Storage, touch
+from tinydb.table import Table
+
+from .ledger import Ledger
+from .rollup import RollupReader, file_stamp, read_rollup
+from .sqlite_ledger import SqliteLedger, migrate_from_tinydb
+
+
+class JournalStorage(Storage):
+    # Keeps the last snapshot in `path` (the same layout JSONStorage writes)
+    # and appends every change after it to `path.journal` as one JSON line.
+    # Saving a transaction appends a single line instead of rewriting the
+    # whole file; the journal is folded back into the snapshot once it grows
+    # past `compact_every` entries and again on close.
+    # Table writes go through update_table (see JournalTable), which only
+    # looks at the documents a write touches; open_database sets that up.
+    def __init__(self, path, compact_every=1000, create_dirs=False, encoding='utf-8'):
+        super().__init__()
+        self.path = path
+        self.journal_path = path + '.journal'
+        self.compact_every = compact_every
+        self.encoding = encoding
+        self._data = None  # replayed lazily on the first read
+        self._journal_entries = 0
+        self._written = False  # read-only sessions leave the files alone on close
+        touch(path, create_dirs=create_dirs)
+
+    def read(self):
+        if self._data is None:
+            self._load()
+        if not self._data:
+            return None
+        # Tables are shared: reads don't modify them, and JournalTable writes
+        # go through update_table rather than editing what was read
+        return dict(self._data)
+
+    def write(self, data):
+        # Whole-database writes, which only dropping tables still makes
+        if self._data is None:
+            self._load()
+        entries = list(diff_tables(self._data, data))
+        self._data = data
+        self._append(entries)
+
+    def update_table(self, name, updater, document_id_class):
+        # Runs a TinyDB table updater on the live table and journals just the
+        # documents it touched, so a write costs the same at any ledger size.
+        # If the updater fails, its changes are undone as TinyDB's would be.
+        if self._data is None:
+            self._load()
+        table = TrackedTable(self._data.setdefault(name, {}), document_id_class)
+        try:
+            updater(table)
+        except BaseException:
+            table.rollback()
+            raise
+        self._append(list(table.entries(name)))
+
+    def _append(self, entries):
+        if not entries:
+            return
+        with open(self.journal_path, 'a', encoding=self.encoding) as journal:
+            journal.write(''.join(json.dumps(entry) + '\n' for entry in entries))
+            journal.flush()
+            os.fsync(journal.fileno())
+        self._journal_entries += len(entries)
+        self._written = True
+
+        if self._journal_entries >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        # Write a fresh snapshot next to the old one, swap it in, then drop the journal
+        if self._data is None:
+            self._load()
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding=self.encoding) as snapshot:
+            json.dump(self._data, snapshot)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(tmp_path, self.path)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._journal_entries = 0
+
+    def close(self):
+        if self._written and self._journal_entries:
+            self.compact()
+
+    def _load(self):
+        data = {}
+        if os.path.getsize(self.path):
+            with open(self.path, encoding=self.encoding) as snapshot:
+                data = json.load(snapshot)
+
+        entries = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'rb+') as journal:
+                offset = 0
+                for line in journal:
+                    # A line without its newline is a torn write from a crash, even
+                    # if it parses: it was never fsynced in full, and the next
+                    # append would run on from it. Drop it so later appends stay readable.
+                    try:
+                        entry = json.loads(line) if line.endswith(b'\n') else None
+                    except ValueError:
+                        entry = None
+                    if entry is None:
+                        journal.truncate(offset)
+                        break
+                    apply_entry(data, entry)
+                    offset += len(line)
+                    entries += 1
+
+        self._data = data
+        self._journal_entries = entries
+        if entries >= self.compact_every:
+            self.compact()
+
+
+_MISSING = object()
+
+
+class TrackedTable(MutableMapping):
+    # What a JournalTable updater edits: the storage's table itself, keyed
+    # by document id, remembering each document as it was when first touched
+    def __init__(self, docs, document_id_class):
+        self.docs = docs  # str doc_id -> document, owned by the storage
+        self.document_id_class = document_id_class
+        self.before = {}  # str doc_id -> copy from before this update, or _MISSING
+        self.cleared = None  # the table as it was, once the updater clears it
+
+    def _touch(self, key):
+        if key not in self.before:
+            doc = self.docs.get(key, _MISSING)
+            self.before[key] = _MISSING if doc is _MISSING else dict(doc)
+
+    def __getitem__(self, doc_id):
+        key = str(doc_id)
+        doc = self.docs[key]
+        self._touch(key)  # TinyDB updates documents in place
+        return doc
+
+    def __setitem__(self, doc_id, doc):
+        key = str(doc_id)
+        self._touch(key)
+        self.docs[key] = doc
+
+    def __delitem__(self, doc_id):
+        key = str(doc_id)
+        self._touch(key)
+        del self.docs[key]
+
+    def __contains__(self, doc_id):
+        return str(doc_id) in self.docs
+
+    def __iter__(self):
+        return (self.document_id_class(key) for key in self.docs)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def clear(self):
+        if self.cleared is None:
+            self.cleared = dict(self.docs)
+            self._restore(self.cleared)
+        self.before = {}
+        self.docs.clear()
+
+    def _restore(self, docs):
+        for key, doc in self.before.items():
+            if doc is _MISSING:
+                docs.pop(key, None)
+            else:
+                docs[key] = doc
+
+    def rollback(self):
+        if self.cleared is not None:
+            self.docs.clear()
+            self.docs.update(self.cleared)
+        else:
+            self._restore(self.docs)
+
+    def entries(self, name):
+        # Journal entries for what the updater changed
+        if self.cleared is not None:
+            yield {'op': 'truncate', 'table': name}
+        for key, old in self.before.items():
+            doc = self.docs.get(key, _MISSING)
+            if doc is _MISSING:
+                if old is not _MISSING:
+                    yield {'op': 'delete', 'table': name, 'id': key}
+            elif old is _MISSING:
+                yield {'op': 'insert', 'table': name, 'id': key, 'doc': doc}
+            elif doc != old:
+                yield {'op': 'upsert', 'table': name, 'id': key, 'doc': doc}
+
+
+class JournalTable(Table):
+    # Table whose writes hand JournalStorage the updater instead of the
+    # whole database; other storages get TinyDB's read-modify-write
+    def _update_table(self, updater):
+        if not isinstance(self._storage, JournalStorage):
+            return super()._update_table(updater)
+        self._storage.update_table(self.name, updater, self.document_id_class)
+        self.clear_cache()
+
+
+class JournalDB(TinyDB):
+    table_class = JournalTable
+
+
+def diff_tables(old, new):
+    # Journal entries that turn `old` into `new`
+    for name in old.keys() - new.keys():
+        yield {'op': 'drop', 'table': name}
+
+    for name, table in new.items():
+        before = old.get(name, {})
+        if table is before:
+            continue  # untouched (read() shares the tables)
+        if before and not table.keys() & before.keys():
+            yield {'op': 'truncate', 'table': name}
+            before = {}
+        for doc_id in before.keys() - table.keys():
+            yield {'op': 'delete', 'table': name, 'id': doc_id}
+        for doc_id, doc in table.items():
+            if doc_id not in before:
+                yield {'op': 'insert', 'table': name, 'id': doc_id, 'doc': doc}
+            elif before[doc_id] != doc:
+                yield {'op': 'upsert', 'table': name, 'id': doc_id, 'doc': doc}
+
+
+def apply_entry(data, entry):
+    op = entry['op']
+    name = entry['table']
+    if op == 'drop':
+        data.pop(name, None)
+    elif op == 'truncate':
+        data[name] = {}
+    elif op == 'delete':
+        data.get(name, {}).pop(entry['id'], None)
+    else:
+        data.setdefault(name, {})[entry['id']] = entry['doc']
+
+
+STORAGES = {
+    'json': JSONStorage,
+    'journal': JournalStorage,
+}
+
+
+def open_database(path='expense_db.json', backend='journal'):
+    return JournalDB(path, storage=STORAGES[backend])
+
+
+def last_modified(path):
+    # The journal (or SQLite WAL) is part of the database once it exists
+    paths = [p for p in (path, path + '.journal', path + '-wal') if os.path.exists(p)]
+    return max(os.path.getmtime(p) for p in paths)
+
+
+DEFAULT_PATHS = {
+    'json': 'expense_db.json',
+    'journal': 'expense_db.json',
+    'sqlite': 'expense_db.sqlite3',
+}
+
+
+def _resolve(backend, path):
+    backend = backend or os.environ.get('MONEYFLEXERSKI_STORAGE', 'journal')
+    if backend not in DEFAULT_PATHS:
+        raise ValueError(f"Unknown storage backend {backend!r}, use one of {', '.join(DEFAULT_PATHS)}")
+    return backend, path or os.environ.get('MONEYFLEXERSKI_DB') or DEFAULT_PATHS[backend]
+
+
+def open_ledger(backend=None, path=None, batch_seconds=0):
+    # Opens the ledger the app and tools read through. Backend and path
+    # default to MONEYFLEXERSKI_STORAGE (journal, json or sqlite) and
+    # MONEYFLEXERSKI_DB. A new SQLite ledger is seeded from the TinyDB JSON
+    # file once, if there is one.
+    # batch_seconds > 0 groups TinyDB inserts; SQLite already writes a
+    # single indexed row per insert, so it commits straight away.
+    backend, path = _resolve(backend, path)
+    if backend != 'sqlite':
+        ledger = Ledger(open_database(path, backend), path=path)
+        if batch_seconds:
+            ledger.enable_batching(interval=batch_seconds)
+        return ledger
+
+    is_new = not os.path.exists(path)
+    ledger = SqliteLedger(path)
+    json_path = DEFAULT_PATHS['journal']
+    if is_new and os.path.exists(json_path):
+        migrate_from_tinydb(open_database(json_path, 'journal'), ledger)
+    return ledger
+
+
+def open_rollup(backend=None, path=None):
+    # For reports that only read totals. A TinyDB ledger whose rollup sidecar
+    # was saved against the database files as they are now is answered from
+    # the sidecar, without loading a record. Otherwise (and for SQLite, which
+    # keeps its rollups in a table) this is open_ledger; closing that saves
+    # a fresh sidecar for next time.
+    backend, path = _resolve(backend, path)
+    if backend != 'sqlite' and os.path.exists(path):
+        rollup = read_rollup(path + '.rollup', files=file_stamp(path))
+        if rollup is not None:
+            return RollupReader(rollup)
+    return open_ledger(backend, path)
@@ -0,0 +1,242 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+
+from .series import prefix_sums
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, summarize_columns loops without it
+    np = None
+
+
+def get_days_in_month(year, month):
+    return (date(year + month // 12, month % 12 + 1, 1) - date(year, month, 1)).days
+
+
+def signed_amount(record):
+    # What a record adds to its section: earnings count up, expenses down and
+    # section entries are stored with their sign already applied
+    if record.get('type') == 'expense':
+        return -record.get('amount', 0)
+    return record.get('amount', 0)
+
+
+class MonthSummary:
+    # Everything the dashboard and both chart types show for one month
+    def __init__(self, year, month):
+        self.year = year
+        self.month = month
+        self.days_in_month = get_days_in_month(year, month)
+        self.monthly_income = 0
+        self.daily_income = 0
+        self.daily_expenses = [0] * self.days_in_month
+        self.daily_additional_earnings = [0] * self.days_in_month
+        self.balances = [0] * self.days_in_month
+        self.total_expenses = 0
+        self.total_additional_earnings = 0
+        self.balance = 0
+        self.section_totals = {}  # section name -> earnings minus expenses
+
+    def as_dict(self, daily=False):
+        data = {
+            'year': self.year,
+            'month': self.month,
+            'monthly_income': self.monthly_income,
+            'total_expenses': self.total_expenses,
+            'total_additional_earnings': self.total_additional_earnings,
+            'balance': self.balance,
+            'section_totals': self.section_totals,
+        }
+        if daily:
+            data['daily_income'] = self.daily_income
+            data['daily_expenses'] = self.daily_expenses
+            data['daily_additional_earnings'] = self.daily_additional_earnings
+            data['balances'] = self.balances
+        return data
+
+
+# Month summaries kept per ledger; enough for a few years of stepping
+# through months without holding a whole range chart's worth
+SUMMARY_CACHE_SIZE = 48
+
+
+class SummaryCache:
+    # (year, month) -> MonthSummary, least recently used evicted past
+    # `limit`. Writers pop the months they touch; the lock covers the
+    # AsyncLedger worker doing that while the prefetch tasks read.
+    def __init__(self, limit=SUMMARY_CACHE_SIZE):
+        self.limit = limit
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            summary = self.entries.get(key)
+            if summary is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return summary
+
+    def __setitem__(self, key, summary):
+        with self.lock:
+            self.entries[key] = summary
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.limit:
+                self.entries.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def pop(self, key, default=None):
+        with self.lock:
+            return self.entries.pop(key, default)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+def summarize_month(records, year, month):
+    # Single pass over the month's records
+    summary = MonthSummary(year, month)
+    income_seen = False
+    for record in records:
+        record_type = record.get('type')
+        amount = record.get('amount', 0)
+        day = min(max(record.get('day', 1), 1), summary.days_in_month)
+
+        if record_type == 'income':
+            if not income_seen:
+                summary.monthly_income = amount
+                income_seen = True
+            continue
+        if record_type == 'expense':
+            summary.daily_expenses[day - 1] += amount
+            summary.total_expenses += amount
+        elif record_type == 'additional_earning':
+            summary.daily_additional_earnings[day - 1] += amount
+            summary.total_additional_earnings += amount
+
+        section = record.get('section')
+        if section:
+            summary.section_totals[section] = summary.section_totals.get(section, 0) + signed_amount(record)
+
+    _finish_summary(summary)
+    return summary
+
+
+def _finish_summary(summary, running=None):
+    # `running` is the month's cumulative earned minus spent when the caller
+    # already has it
+    if summary.monthly_income:
+        summary.daily_income = summary.monthly_income / summary.days_in_month
+
+    # Running balance: the day's income share plus everything earned minus spent so far
+    if running is None:
+        differences = [earned - spent for earned, spent in zip(summary.daily_additional_earnings, summary.daily_expenses)]
+        running = prefix_sums(differences)
+    summary.balances = [summary.daily_income + total for total in running]
+
+    summary.balance = summary.monthly_income + summary.total_additional_earnings - summary.total_expenses
+
+
+# Day cells per month in summarize_columns; shorter months leave the tail empty
+DAY_SLOTS = 31
+
+
+def summarize_columns(months, slots, days, types, amounts, sections, type_names, section_names):
+    # The batched summarize_month. Records come as parallel columns: `slots`
+    # index into `months`, `days` are as stored (0 counts as day 1), `types`
+    # and `sections` are codes into type_names / section_names, section 0
+    # meaning none. With NumPy the daily sums, totals and section totals are
+    # np.bincount over (month, day) and (month, section) cells and the
+    # balances a cumsum along each month. bincount and cumsum both add in
+    # record order, so the floats come out exactly as summarize_month's.
+    summaries = [MonthSummary(year, month) for year, month in months]
+    codes = {name: code for code, name in enumerate(type_names)}
+    income = codes.get('income', -1)
+    expense = codes.get('expense', -1)
+    earning = codes.get('additional_earning', -1)
+    if np is None or not summaries:
+        return _summarize_columns_loop(summaries, slots, days, types, amounts, sections, section_names, income, expense, earning)
+
+    count = len(summaries)
+    slots = np.asarray(slots, dtype=np.int64)
+    types = np.asarray(types, dtype=np.int64)
+    amounts = np.asarray(amounts, dtype=float)
+    sections = np.asarray(sections, dtype=np.int64)
+    month_days = np.array([summary.days_in_month for summary in summaries], dtype=np.int64)
+    cells = slots * DAY_SLOTS + np.minimum(np.maximum(np.asarray(days, dtype=np.int64), 1), month_days[slots]) - 1
+
+    def daily(selected):
+        return np.bincount(cells[selected], weights=amounts[selected], minlength=count * DAY_SLOTS).reshape(count, DAY_SLOTS)
+
+    def totals(selected):
+        return np.bincount(slots[selected], weights=amounts[selected], minlength=count)
+
+    is_expense = types == expense
+    is_earning = types == earning
+    daily_expenses, daily_earnings = daily(is_expense), daily(is_earning)
+    running = np.cumsum(daily_earnings - daily_expenses, axis=1)
+    total_expenses, total_earnings = totals(is_expense).tolist(), totals(is_earning).tolist()
+    has_expenses, has_earnings = np.bincount(slots[is_expense], minlength=count), np.bincount(slots[is_earning], minlength=count)
+
+    # The first income record of each month counts, as in summarize_month
+    income_rows = np.flatnonzero(types == income)
+    income_slots, first = np.unique(slots[income_rows], return_index=True)
+    for slot, amount in zip(income_slots.tolist(), amounts[income_rows[first]].tolist()):
+        summaries[slot].monthly_income = amount
+
+    in_section = (sections > 0) & (types != income)
+    width = len(section_names)
+    keys = slots[in_section] * width + sections[in_section]
+    signed = np.where(is_expense[in_section], -amounts[in_section], amounts[in_section])
+    section_sums = np.bincount(keys, weights=signed, minlength=count * width)
+    for key in np.unique(keys).tolist():
+        slot, section = divmod(key, width)
+        summaries[slot].section_totals[section_names[section]] = float(section_sums[key])
+
+    for slot, summary in enumerate(summaries):
+        size = summary.days_in_month
+        summary.daily_expenses = daily_expenses[slot, :size].tolist()
+        summary.daily_additional_earnings = daily_earnings[slot, :size].tolist()
+        if has_expenses[slot]:
+            summary.total_expenses = total_expenses[slot]
+        if has_earnings[slot]:
+            summary.total_additional_earnings = total_earnings[slot]
+        _finish_summary(summary, running[slot, :size].tolist())
+    return summaries
+
+
+def _summarize_columns_loop(summaries, slots, days, types, amounts, sections, section_names, income, expense, earning):
+    # summarize_columns without NumPy: summarize_month's loop over the columns
+    income_seen = set()
+    for slot, day, record_type, amount, section in zip(slots, days, types, amounts, sections):
+        summary = summaries[slot]
+        if record_type == income:
+            if slot not in income_seen:
+                summary.monthly_income = amount
+                income_seen.add(slot)
+            continue
+        day = min(max(day, 1), summary.days_in_month)
+        if record_type == expense:
+            summary.daily_expenses[day - 1] += amount
+            summary.total_expenses += amount
+        elif record_type == earning:
+            summary.daily_additional_earnings[day - 1] += amount
+            summary.total_additional_earnings += amount
+        if section:
+            name = section_names[section]
+            summary.section_totals[name] = summary.section_totals.get(name, 0) + (-amount if record_type == expense else amount)
+
+    for summary in summaries:
+        _finish_summary(summary)
+    return summaries
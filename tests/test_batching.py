@@ -0,0 +1,27 @@
+import threading
+
+from moneyflexerski import open_ledger
+
+
+def test_timer_flush_and_inserts_do_not_deadlock(tmp_path):
+    # The timer thread flushes (batcher lock, then ledger lock) while other
+    # threads insert; insert must never hold the ledger lock while queueing
+    path = str(tmp_path / 'ledger.json')
+    ledger = open_ledger('json', path, batch_seconds=0.001)
+    ledger.batcher.max_batch = 7
+
+    def insert_many(worker):
+        for i in range(200):
+            ledger.insert({'type': 'expense', 'amount': 1.0, 'day': 1 + i % 28, 'year': 2024, 'month': 1 + worker})
+
+    threads = [threading.Thread(target=insert_many, args=(worker,), daemon=True) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    assert not any(thread.is_alive() for thread in threads), "inserts deadlocked with the batch flush"
+
+    ledger.close()
+    reopened = open_ledger('json', path)
+    assert len(reopened) == 800
+    reopened.close()
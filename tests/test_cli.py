@@ -0,0 +1,58 @@
+import argparse
+import json
+
+import pytest
+
+from moneyflexerski import open_ledger
+from moneyflexerski.cli import _month, main
+from moneyflexerski.rollup import RollupReader
+from moneyflexerski.storage import open_rollup
+
+
+def test_range_matches_the_month_summaries(tmp_path, capsys):
+    path = str(tmp_path / 'ledger.json')
+    ledger = open_ledger('json', path)
+    ledger.insert({'type': 'income', 'amount': 3000.0, 'year': 2024, 'month': 1})
+    ledger.insert({'type': 'expense', 'amount': 120.5, 'day': 3, 'year': 2024, 'month': 1, 'section': 'food'})
+    ledger.insert({'type': 'additional_earning', 'amount': 40.0, 'day': 9, 'year': 2024, 'month': 2})
+    ledger.insert({'type': 'section_entry', 'amount': -15.0, 'day': 9, 'year': 2024, 'month': 2, 'section': 'food'})
+    expected = []
+    for month in (12, 1, 2):
+        summary = ledger.month_summary(2023 if month == 12 else 2024, month).as_dict()
+        del summary['section_totals']
+        expected.append(summary)
+    ledger.close()
+
+    assert main(['--backend', 'json', '--db', path, 'range', '2023-12', '2024-02']) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report['months'] == expected
+    assert report['totals'] == {
+        'monthly_income': 3000.0, 'total_expenses': 120.5, 'total_additional_earnings': 40.0, 'balance': 2919.5,
+    }
+
+
+def test_range_reads_only_the_saved_rollup_while_it_is_current(tmp_path, capsys):
+    path = str(tmp_path / 'ledger.json')
+    ledger = open_ledger('json', path)
+    ledger.insert({'type': 'expense', 'amount': 10.0, 'day': 1, 'year': 2024, 'month': 1})
+    ledger.close()
+
+    reader = open_rollup('json', path)
+    assert isinstance(reader, RollupReader)
+    assert reader.monthly_totals((2024, 1), (2024, 1)) == {(2024, 1): {'expense': 10.0}}
+
+    # A write the sidecar wasn't saved after falls back to loading the records
+    writer = open_ledger('json', path)
+    writer.insert({'type': 'expense', 'amount': 5.0, 'day': 2, 'year': 2024, 'month': 1})
+    writer.db.close()
+    assert not isinstance(open_rollup('json', path), RollupReader)
+
+    assert main(['--backend', 'json', '--db', path, 'range', '2024-01', '2024-01']) == 0
+    assert json.loads(capsys.readouterr().out)['totals']['total_expenses'] == 15.0
+    assert isinstance(open_rollup('json', path), RollupReader)  # Saved again by that run
+
+
+@pytest.mark.parametrize('value', ['2024-13', '2024-00', '2024', 'May'])
+def test_month_arguments_are_checked(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        _month(value)
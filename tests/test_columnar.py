@@ -0,0 +1,70 @@
+import pytest
+
+from moneyflexerski import ColumnStore, columnar, open_ledger, summary
+from moneyflexerski.series import iter_months
+
+RECORDS = [
+    {'type': 'income', 'amount': 3000.0, 'year': 2024, 'month': 1},
+    {'type': 'expense', 'amount': 12.25, 'day': 3, 'year': 2024, 'month': 1, 'section': 'food'},
+    {'type': 'additional_earning', 'amount': 40.0, 'day': 9, 'year': 2024, 'month': 1, 'section': 'side'},
+    {'type': 'section_entry', 'amount': -15.5, 'day': 20, 'year': 2024, 'month': 2, 'section': 'food'},
+    {'type': 'expense', 'amount': 99.0, 'day': 31, 'year': 2024, 'month': 2},  # Past the end of February
+    {'type': 'expense', 'amount': 5.0, 'year': 2024, 'month': 3},  # No day
+] + [
+    {'type': 'expense' if i % 3 else 'additional_earning', 'amount': float(i), 'day': 1 + i % 28,
+     'year': 2023 + i % 2, 'month': 1 + i % 12, **({'section': 'food'} if i % 5 == 0 else {})}
+    for i in range(300)
+]
+START, END = (2023, 1), (2024, 12)
+
+
+@pytest.fixture(params=['numpy', 'plain'])
+def arrays(request, monkeypatch):
+    # The same checks on the NumPy path and on the plain loops
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(columnar, 'np', None)
+        monkeypatch.setattr(summary, 'np', None)
+    return request.param
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = open_ledger('json', str(tmp_path / 'ledger.json'))
+    ledger.insert_multiple(RECORDS)
+    yield ledger
+    ledger.close()
+
+
+def approx_totals(totals):
+    return {key: pytest.approx(value) for key, value in totals.items()}
+
+
+def test_monthly_and_section_totals_match_the_ledger(arrays, ledger):
+    store = ColumnStore.from_ledger(ledger)
+    assert len(store) == len(RECORDS)
+    assert store.monthly_totals(START, END) == approx_totals(ledger.monthly_totals(START, END))
+    assert store.section_totals() == approx_totals(ledger.section_totals())
+
+
+def test_month_summaries_match_the_ledger(arrays, ledger):
+    store = ColumnStore.from_ledger(ledger)
+    months = list(iter_months(START, END))
+    for ours, theirs in zip(store.month_summaries(months), ledger.month_summaries(months)):
+        expected = theirs.as_dict(daily=True)
+        found = ours.as_dict(daily=True)
+        assert found.pop('section_totals') == approx_totals(expected.pop('section_totals'))
+        assert found == pytest.approx(expected)
+
+
+def test_filters_and_totals(arrays):
+    store = ColumnStore.from_records(RECORDS)
+    expenses_2024 = [r for r in RECORDS if r['type'] == 'expense' and r['year'] == 2024]
+    assert store.total(year=2024, record_type='expense') == pytest.approx(sum(r['amount'] for r in expenses_2024))
+    assert list(store.iter_records(year=2024, record_type='expense')) == expenses_2024
+    assert store.total(section='nowhere') == 0
+    assert store.type_totals(month=1) == approx_totals({
+        name: sum(r['amount'] for r in RECORDS if r['month'] == 1 and r['type'] == name)
+        for name in {r['type'] for r in RECORDS if r['month'] == 1}
+    })
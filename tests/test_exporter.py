@@ -0,0 +1,60 @@
+import csv
+
+import pytest
+
+from moneyflexerski import exporter, export_ledger, open_ledger, read_columnar
+
+RECORDS = [
+    {'type': 'income', 'amount': 3000.0, 'year': 2024, 'month': 1},
+    {'type': 'expense', 'amount': 12.25, 'day': 3, 'year': 2024, 'month': 1, 'section': 'food'},
+    {'type': 'additional_earning', 'amount': 40.0, 'day': 9, 'year': 2024, 'month': 2},
+    {'type': 'section_entry', 'amount': -15.5, 'day': 31, 'year': 2023, 'month': 12, 'section': 'rent'},
+] + [
+    {'type': 'expense', 'amount': float(i), 'day': 1 + i % 28, 'year': 2022 + i % 3, 'month': 1 + i % 12}
+    for i in range(50)
+]
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def ledger(request, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # No JSON ledger for SQLite to seed from
+    ledger = open_ledger(request.param, str(tmp_path / f'ledger.{request.param}'))
+    ledger.insert_multiple(RECORDS)
+    yield ledger
+    ledger.close()
+
+
+@pytest.mark.parametrize('filters', [{}, {'year': 2024}, {'year': 2024, 'month': 1}, {'record_type': 'expense'}, {'section': 'food'}])
+def test_columnar_round_trip(ledger, tmp_path, monkeypatch, filters):
+    monkeypatch.setattr(exporter, 'ROW_GROUP_SIZE', 7)  # Several row groups
+    path = str(tmp_path / 'out.mfcol')
+    expected = [dict(record) for record in ledger.iter_records(**filters)]
+    assert export_ledger(ledger, path, **filters) == len(expected)
+    assert list(read_columnar(path)) == expected
+
+
+def test_csv_round_trip(ledger, tmp_path):
+    path = str(tmp_path / 'out.csv')
+    assert export_ledger(ledger, path) == len(RECORDS)
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    expected = [
+        {column: str(record.get(column, '')) for column in exporter.COLUMNS}
+        for record in ledger.iter_records()
+    ]
+    assert rows == expected
+
+
+def test_parquet_round_trip(ledger, tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    path = str(tmp_path / 'out.parquet')
+    assert export_ledger(ledger, path) == len(RECORDS)
+    expected = [{column: record.get(column) for column in exporter.COLUMNS} for record in ledger.iter_records()]
+    assert pq.read_table(path).to_pylist() == expected
+
+
+def test_read_columnar_rejects_other_files(tmp_path):
+    path = tmp_path / 'not.mfcol'
+    path.write_bytes(b'type,amount\n')
+    with pytest.raises(ValueError):
+        list(read_columnar(str(path)))
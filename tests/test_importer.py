@@ -0,0 +1,103 @@
+import atexit
+import io
+import os
+
+from moneyflexerski import import_file, open_ledger, read_csv, read_ofx
+from moneyflexerski.importer import _ofx_tags
+
+OFX_SGML = """OFXHEADER:100
+DATA:OFXSGML
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240305120000<TRNAMT>-12,50<NAME>Groceries</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240307<TRNAMT>100.00<NAME>Refund</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>not a date<TRNAMT>-1.00</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+OFX_XML = """<?xml version="1.0"?>
+<OFX><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT</TRNTYPE><DTPOSTED>20240305</DTPOSTED><TRNAMT>-12.50</TRNAMT></STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT</TRNTYPE><DTPOSTED>20240307</DTPOSTED><TRNAMT>100.00</TRNAMT></STMTTRN>
+</BANKTRANLIST></OFX>
+"""
+
+EXPECTED_OFX = [
+    {'type': 'expense', 'amount': 12.5, 'day': 5, 'year': 2024, 'month': 3},
+    {'type': 'additional_earning', 'amount': 100.0, 'day': 7, 'year': 2024, 'month': 3},
+]
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_csv_signed_amounts_and_unparseable_rows(tmp_path):
+    path = write(tmp_path, 'bank.csv', "Date,Amount\n2024-03-05,-12.50\n2024-03-07,\"1,000.00\"\nyesterday,5\n2024-03-08,abc\n")
+    assert list(read_csv(path)) == [
+        {'type': 'expense', 'amount': 12.5, 'day': 5, 'year': 2024, 'month': 3},
+        {'type': 'additional_earning', 'amount': 1000.0, 'day': 7, 'year': 2024, 'month': 3},
+        None,
+        None,
+    ]
+
+
+def test_csv_with_a_custom_mapping(tmp_path):
+    path = write(tmp_path, 'bank.csv', "When;Value;Kind;Pot\n05.03.2024;1.234,50;Expense; food \n07.03.2024;20,00;other;\n")
+    mapping = {
+        'date': 'When', 'amount': 'Value', 'type': 'Kind', 'section': 'Pot',
+        'date_format': '%d.%m.%Y', 'delimiter': ';', 'decimal': ',',
+    }
+    assert list(read_csv(path, mapping)) == [
+        {'type': 'expense', 'amount': 1234.5, 'day': 5, 'year': 2024, 'month': 3, 'section': 'food'},
+        # An unknown type falls back to the sign
+        {'type': 'additional_earning', 'amount': 20.0, 'day': 7, 'year': 2024, 'month': 3},
+    ]
+
+
+def test_ofx_sgml_and_xml_statements(tmp_path):
+    assert list(read_ofx(write(tmp_path, 'sgml.ofx', OFX_SGML))) == EXPECTED_OFX + [None]
+    assert list(read_ofx(write(tmp_path, 'xml.ofx', OFX_XML))) == EXPECTED_OFX
+
+
+def test_ofx_tags_split_across_chunks():
+    whole = list(_ofx_tags(io.StringIO(OFX_XML)))
+    assert list(_ofx_tags(io.StringIO(OFX_XML), chunk_size=7)) == whole
+
+
+def test_reimport_skips_rows_already_in_the_ledger(tmp_path):
+    ledger = open_ledger('json', str(tmp_path / 'ledger.json'))
+    # The same purchase twice on one day is two records, not a duplicate
+    path = write(tmp_path, 'bank.csv', "Date,Amount\n2024-03-05,-12.50\n2024-03-05,-12.50\n2024-03-06,-3.00\n")
+
+    first = import_file(ledger, path)
+    assert (first.read, first.imported, first.duplicates, first.skipped) == (3, 3, 0, 0)
+
+    more = write(tmp_path, 'more.csv', "Date,Amount\n2024-03-05,-12.50\n2024-03-05,-12.50\n2024-03-05,-12.50\n2024-03-06,-3.00\n")
+    second = import_file(ledger, more)
+    assert (second.read, second.imported, second.duplicates) == (4, 1, 3)
+    assert len(ledger) == 4
+    ledger.close()
+
+
+def test_queued_records_are_recovered_from_the_pending_file(tmp_path):
+    path = str(tmp_path / 'ledger.json')
+    ledger = open_ledger('json', path, batch_seconds=60)
+    for day in (1, 2, 3):
+        ledger.insert({'type': 'expense', 'amount': float(day), 'day': day, 'year': 2024, 'month': 3})
+    # Crash before the batch is written: nothing flushes it
+    ledger.batcher.timer.cancel()
+    atexit.unregister(ledger.batcher.flush)
+    ledger.db.close()
+    with open(path + '.pending', 'a', encoding='utf-8') as pending:
+        pending.write('{"id": 4, "rec')  # Torn last line
+
+    reopened = open_ledger('json', path, batch_seconds=60)
+    assert sorted(doc['day'] for doc in reopened.all()) == [1, 2, 3]
+    assert not os.path.exists(path + '.pending')
+    reopened.close()
+
+    stored = open_ledger('json', path)
+    assert sorted(doc['day'] for doc in stored.all()) == [1, 2, 3]
+    stored.close()
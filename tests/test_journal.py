@@ -0,0 +1,51 @@
+import json
+import os
+
+import pytest
+from tinydb.table import Document
+
+from moneyflexerski import open_database
+
+
+def test_unterminated_last_line_is_dropped_before_appending(tmp_path):
+    path = str(tmp_path / 'ledger.json')
+    db = open_database(path)
+    for day in range(1, 6):
+        db.insert({'type': 'expense', 'amount': 1.0, 'day': day, 'year': 2024, 'month': 1})
+
+    # Crash mid-append: the last entry made it to disk without its newline
+    journal_path = path + '.journal'
+    with open(journal_path, 'rb+') as journal:
+        journal.truncate(os.path.getsize(journal_path) - 1)
+
+    db = open_database(path)
+    assert len(db) == 4
+    for day in range(10, 13):
+        db.insert({'type': 'expense', 'amount': 1.0, 'day': day, 'year': 2024, 'month': 1})
+
+    # Every acknowledged insert survives the next replay
+    days = sorted(doc['day'] for doc in open_database(path).all())
+    assert days == [1, 2, 3, 4, 10, 11, 12]
+
+
+def test_writes_journal_only_the_documents_they_touch(tmp_path):
+    path = str(tmp_path / 'ledger.json')
+    db = open_database(path)
+    db.insert_multiple({'n': n, 'v': 0} for n in range(1000))
+    db.storage.compact()
+
+    db.update({'v': 1}, doc_ids=[3])
+    db.remove(doc_ids=[4])
+    db.insert({'n': 1000, 'v': 0})
+    with open(path + '.journal', encoding='utf-8') as journal:
+        assert [json.loads(line)['op'] for line in journal] == ['upsert', 'delete', 'insert']
+
+    # A failed bulk insert leaves nothing behind, as with TinyDB's own storages
+    with pytest.raises(ValueError):
+        db.insert_multiple([Document({'n': -1}, 5000), Document({'n': -2}, 1)])
+
+    reopened = open_database(path)
+    assert len(reopened) == 1000
+    assert reopened.get(doc_id=3)['v'] == 1
+    assert reopened.get(doc_id=4) is None
+    assert reopened.get(doc_id=5000) is None
@@ -0,0 +1,45 @@
+import pytest
+
+from moneyflexerski import open_ledger
+
+RECORDS = [
+    {'type': 'expense', 'amount': float(amount), 'day': 1 + amount % 28, 'year': year, 'month': month}
+    for amount, (year, month) in enumerate([(2023, 9), (2024, 3), (2024, 2), (2023, 3), (2024, 1), (2024, 3), (2022, 3)] * 3, 1)
+]
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def ledger(request, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # No JSON ledger for SQLite to seed from
+    ledger = open_ledger(request.param, str(tmp_path / f'ledger.{request.param}'))
+    for record in RECORDS:
+        ledger.insert(record)
+    yield ledger
+    ledger.close()
+
+
+@pytest.mark.parametrize('year, month', [(None, None), (2024, None), (None, 3), (2024, 3)])
+def test_top_records_filters_on_year_and_month(ledger, year, month):
+    expected = sorted(
+        (record for record in RECORDS if year in (None, record['year']) and month in (None, record['month'])),
+        key=lambda record: record['amount'], reverse=True,
+    )[:4]
+    found = ledger.top_records(4, 'expense', year, month)
+    assert [(record['amount'], record['year'], record['month']) for record in found] == [
+        (record['amount'], record['year'], record['month']) for record in expected
+    ]
+
+
+@pytest.mark.parametrize('filters', [
+    {}, {'year': 2024}, {'year': 2024, 'month': 3}, {'year': 2024, 'month': 3, 'record_type': 'expense'},
+    {'record_type': 'expense'}, {'section': 'food'},
+])
+def test_iter_records_in_date_order_whatever_the_filters(tmp_path, filters):
+    ledger = open_ledger('json', str(tmp_path / 'ledger.json'))
+    for day in (20, 3, 11, 3, 28, 1):
+        ledger.insert({'type': 'expense', 'amount': float(day), 'day': day, 'year': 2024, 'month': 3, 'section': 'food'})
+        ledger.insert({'type': 'additional_earning', 'amount': 1.0, 'day': day, 'year': 2024, 'month': 2})
+    found = list(ledger.iter_records(**filters))
+    assert found
+    assert found == sorted(found, key=lambda doc: (doc['year'], doc['month'], doc['day'], doc.doc_id))
+    ledger.close()
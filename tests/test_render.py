@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('flet')
+
+from moneyflexerski.app import RenderScheduler  # noqa: E402
+
+
+class Page:
+    def __init__(self):
+        self.updates = 0
+
+    def update(self):
+        self.updates += 1
+
+
+def test_each_task_batches_on_its_own():
+    page = Page()
+    drawn = []
+    renderer = RenderScheduler(page, {'a': lambda: drawn.append('a'), 'b': lambda: drawn.append('b')})
+
+    async def slow_handler(release):
+        with renderer.batch():
+            renderer.mark('a')
+            await release.wait()
+
+    async def quick_handler():
+        with renderer.batch():
+            renderer.mark('b')
+
+    async def scenario():
+        release = asyncio.Event()
+        slow = asyncio.create_task(slow_handler(release))
+        await asyncio.sleep(0)
+        await asyncio.create_task(quick_handler())
+        updates_during_slow = page.updates  # The quick handler isn't held back
+        release.set()
+        await slow
+        return updates_during_slow
+
+    assert asyncio.run(scenario()) == 1
+    assert sorted(drawn) == ['a', 'b']  # Dirty regions are shared, the first flush draws both
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from moneyflexerski import open_database, open_ledger, summarize_month
+from moneyflexerski.series import iter_months
+
+RECORDS = [
+    {'type': 'income', 'amount': 3000.0, 'year': 2024, 'month': 1},
+    {'type': 'income', 'amount': 3100.0, 'year': 2024, 'month': 2},
+    {'type': 'expense', 'amount': 12.25, 'day': 3, 'year': 2024, 'month': 1, 'section': 'food'},
+    {'type': 'expense', 'amount': 7.75, 'day': 3, 'year': 2024, 'month': 1},
+    {'type': 'additional_earning', 'amount': 40.0, 'day': 9, 'year': 2024, 'month': 1, 'section': 'side'},
+    {'type': 'section_entry', 'amount': -15.5, 'day': 20, 'year': 2024, 'month': 2, 'section': 'food'},
+    {'type': 'expense', 'amount': 99.0, 'day': 31, 'year': 2024, 'month': 2},  # Past the end of February
+    {'type': 'expense', 'amount': 5.0, 'year': 2024, 'month': 3},  # No day
+] + [
+    {'type': 'expense', 'amount': float(i), 'day': 1 + i % 28, 'year': 2023 + i % 2, 'month': 1 + i % 12}
+    for i in range(60)
+]
+
+
+def test_rollup_totals_match_the_month_summaries(tmp_path):
+    ledger = open_ledger('json', str(tmp_path / 'ledger.json'))
+    ledger.insert_multiple(RECORDS)
+    start, end = (2023, 1), (2024, 12)
+    monthly = ledger.monthly_totals(start, end)
+    daily = ledger.daily_totals(start, end)
+
+    for year, month in iter_months(start, end):
+        summary = summarize_month([r for r in RECORDS if (r['year'], r['month']) == (year, month)], year, month)
+        types = monthly.get((year, month), {})
+        assert types.get('income', 0) == pytest.approx(summary.monthly_income)
+        assert types.get('expense', 0) == pytest.approx(summary.total_expenses)
+        assert types.get('additional_earning', 0) == pytest.approx(summary.total_additional_earnings)
+        assert ledger.section_rollup((year, month), (year, month)) == pytest.approx(summary.section_totals)
+
+        # Daily cells, clamped into the month the way summarize_month does it
+        expenses = [0] * summary.days_in_month
+        for (y, m, day), day_types in daily.items():
+            if (y, m) == (year, month):
+                expenses[min(day, summary.days_in_month) - 1] += day_types.get('expense', 0)
+        assert expenses == pytest.approx(summary.daily_expenses)
+    ledger.close()
+
+
+def test_saved_rollup_is_reused_until_the_records_change(tmp_path):
+    path = str(tmp_path / 'ledger.json')
+    ledger = open_ledger('json', path)
+    ledger.insert_multiple(RECORDS)
+    ledger.close()
+
+    reopened = open_ledger('json', path)
+    assert not reopened.rollup_dirty  # Loaded from the sidecar
+    reopened.close()
+
+    # A record added behind the ledger's back leaves the saved stamp stale
+    db = open_database(path)
+    db.insert({'type': 'expense', 'amount': 1000.0, 'day': 1, 'year': 2024, 'month': 1})
+    db.close()
+    with open(path + '.rollup', encoding='utf-8') as f:
+        saved_stamp = json.load(f)['stamp']
+
+    rebuilt = open_ledger('json', path)
+    assert rebuilt.rollup_dirty
+    assert rebuilt.rollup_stamp() != saved_stamp
+    assert rebuilt.monthly_totals((2024, 1), (2024, 1))[(2024, 1)]['expense'] == pytest.approx(
+        sum(r['amount'] for r in RECORDS if (r['year'], r['month'], r['type']) == (2024, 1, 'expense')) + 1000.0
+    )
+    rebuilt.close()
+
+
+def test_unreadable_sidecar_is_rebuilt(tmp_path):
+    path = str(tmp_path / 'ledger.json')
+    ledger = open_ledger('json', path)
+    ledger.insert_multiple(RECORDS)
+    ledger.close()
+    with open(path + '.rollup', 'w', encoding='utf-8') as f:
+        f.write('{"stamp": ')
+
+    reopened = open_ledger('json', path)
+    assert reopened.rollup_dirty
+    assert reopened.monthly_totals((2024, 1), (2024, 1))[(2024, 1)]['income'] == 3000.0
+    reopened.close()
@@ -0,0 +1,52 @@
+import sqlite3
+
+import pytest
+
+from moneyflexerski import open_ledger
+
+
+def test_rebuild_section_balances_keeps_queued_records(tmp_path):
+    # Records still waiting in the batch are written before the index is reread
+    path = str(tmp_path / 'ledger.json')
+    ledger = open_ledger('json', path, batch_seconds=60)
+    ledger.add_section('food', 100)
+    ledger.add_section_entry('food', -30, 2024, 1, 5)
+
+    assert ledger.rebuild_section_balances() == [{'name': 'food', 'balance': 70}]
+    ledger.add_section_entry('food', -20, 2024, 1, 6)
+    ledger.flush()
+    ledger.close()
+
+    reopened = open_ledger('json', path)
+    assert reopened.load_sections() == [{'name': 'food', 'balance': 50}]
+    assert len(reopened.section_records('food')) == 2
+    reopened.close()
+
+
+def test_sqlite_load_sections_corrects_drifted_balances(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # No JSON ledger to seed from
+    path = str(tmp_path / 'ledger.sqlite')
+    ledger = open_ledger('sqlite', path)
+    ledger.add_section('food', 100)
+    ledger.add_section_entry('food', -30, 2024, 1, 5)
+    ledger.close()
+
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("UPDATE sections SET balance = 12345 WHERE name = 'food'")
+    conn.close()
+
+    reopened = open_ledger('sqlite', path)
+    assert reopened.load_sections() == [{'name': 'food', 'balance': 70}]
+    reopened.close()
+
+
+@pytest.mark.parametrize('backend', ['json', 'sqlite'])
+def test_entry_for_an_unknown_section_is_rejected(tmp_path, monkeypatch, backend):
+    monkeypatch.chdir(tmp_path)
+    ledger = open_ledger(backend, str(tmp_path / f'ledger.{backend}'))
+    ledger.load_sections()
+    with pytest.raises(ValueError):
+        ledger.add_section_entry('nope', 5, 2024, 1, 1)
+    assert ledger.section_records('nope') == []
+    ledger.close()
@@ -0,0 +1,69 @@
+import math
+
+import pytest
+
+from moneyflexerski.series import DOWNSAMPLERS, build_cumulative, downsample, lttb, minmax_buckets
+
+
+def test_balance_carries_earlier_months_income():
+    # Two 30-day-ish months with 310 and 280 of income and one expense each
+    months = [(2023, 1, 31), (2023, 2, 28)]
+    daily_income = [10.0] * 31 + [10.0] * 28
+    daily_expenses = [0.0] * 59
+    daily_earnings = [0.0] * 59
+    daily_expenses[0] = 50.0
+    daily_earnings[40] = 5.0
+
+    series = build_cumulative(months, daily_income, daily_expenses, daily_earnings)
+
+    assert series.balances[0] == pytest.approx(10 - 50)
+    assert series.balances[30] == pytest.approx(310 - 50)
+    assert series.balances[-1] == pytest.approx(590 + 5 - 50)
+    assert series.balances == pytest.approx([i + e - x for i, e, x in zip(series.income, series.earnings, series.expenses)])
+
+
+def test_long_ranges_give_the_same_balances():
+    # Past 256 days the NumPy path (when installed) builds the balances
+    months = [(2023, month, 28) for month in range(1, 13)]
+    size = 28 * 12
+    series = build_cumulative(months, [1.0] * size, [0.5] * size, [0.25] * size)
+    assert series.balances[-1] == pytest.approx(size * 0.75)
+
+
+def wave(n):
+    # Slow oscillation with one sharp spike and one sharp dip
+    ys = [math.sin(i / 25) * 100 for i in range(n)]
+    ys[333] = 1000.0
+    ys[777] = -1000.0
+    return ys
+
+
+@pytest.mark.parametrize('method', sorted(DOWNSAMPLERS))
+@pytest.mark.parametrize('threshold', [4, 10, 240])
+def test_downsamplers_keep_size_order_and_extremes(method, threshold):
+    ys = wave(1000)
+    picked = DOWNSAMPLERS[method](ys, threshold)
+    assert len(picked) <= threshold
+    assert picked == sorted(set(picked))
+    assert 333 in picked and 777 in picked
+
+
+def test_lttb_keeps_the_endpoints_and_fills_the_threshold():
+    ys = wave(1000)
+    picked = lttb(ys, 50)
+    assert len(picked) == 50
+    assert picked[0] == 0 and picked[-1] == 999
+
+
+def test_minmax_buckets_keep_every_bucket_extreme():
+    ys = wave(1000)
+    picked = minmax_buckets(ys, 100)
+    assert 0 < len(picked) <= 100
+    assert ys.index(max(ys)) in picked and ys.index(min(ys)) in picked
+
+
+@pytest.mark.parametrize('method', sorted(DOWNSAMPLERS))
+def test_short_lines_are_left_alone(method):
+    ys = [3.0, 1.0, 2.0]
+    assert DOWNSAMPLERS[method](ys, 10) == [0, 1, 2]
+    assert downsample(ys, 10, method) == [(0, 3.0), (1, 1.0), (2, 2.0)]
@@ -0,0 +1,43 @@
+import sqlite3
+
+import pytest
+
+from moneyflexerski import SqliteLedger
+from moneyflexerski import sqlite_ledger
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = SqliteLedger(str(tmp_path / 'ledger.sqlite3'))
+    yield ledger
+    ledger.close()
+
+
+def test_insert_multiple_is_one_transaction(ledger):
+    records = [
+        {'type': 'expense', 'amount': 5.0, 'day': 1, 'year': 2024, 'month': 1},
+        {'type': 'income', 'amount': 3000.0, 'year': 2024, 'month': 1},
+        {'type': 'income', 'year': 2024, 'month': 2},  # No amount
+    ]
+    with pytest.raises(KeyError):
+        ledger.insert_multiple(records)
+    assert ledger.conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == 0
+    assert ledger.conn.execute("SELECT COUNT(*) FROM monthly_income").fetchone()[0] == 0
+
+
+def test_abandoned_iter_records_closes_its_connection(ledger, monkeypatch):
+    ledger.insert_multiple({'type': 'expense', 'amount': 1.0, 'day': day, 'year': 2024, 'month': 1} for day in range(1, 11))
+    opened = []
+    real_connect = sqlite3.connect
+
+    def connect(path):
+        conn = real_connect(path)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(sqlite_ledger.sqlite3, 'connect', connect)
+    records = ledger.iter_records(record_type='expense')
+    next(records)
+    records.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[0].execute("SELECT 1")